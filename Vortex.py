@@ -5,65 +5,35 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageGrab
-import pytesseract
-import cv2
-import numpy as np
-import requests
 import threading
-import re
 import json
 import time
 import os
 import sys
-import random
 import math
-from io import BytesIO
 
+import anim
+import config
+import tracing
 
-DISCORD_WEBHOOK_URL = "x" 
-CONFIG_FILE = "config.json"
+# ocr/backends/engine (cv2, numpy, pytesseract), PIL and requests are imported
+# where first used, and warmed on a background thread once the landing window
+# is up, so the first frame never waits on them.
 
+_T0 = time.time()
+
+DISCORD_WEBHOOK_URL = "x" 
 
-def get_tesseract_cmd():
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, "Tesseract-OCR", "tesseract.exe")
-    
-    local_tess = os.path.join(os.getcwd(), "Tesseract-OCR", "tesseract.exe")
-    if os.path.exists(local_tess):
-        return local_tess
-        
-    paths = [
-        r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-        r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-        os.path.join(os.getenv('LOCALAPPDATA'), 'Tesseract-OCR', 'tesseract.exe')
-    ]
-    for p in paths:
-        if os.path.exists(p):
-            return p
-    return None
-
-pytesseract.pytesseract.tesseract_cmd = get_tesseract_cmd()
 
 def load_webhook():
     global DISCORD_WEBHOOK_URL
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                data = json.load(f)
-                val = data.get("webhook", "")
-                if val: DISCORD_WEBHOOK_URL = val
-        except: pass
+    val = config.get("webhook", "")
+    if val: DISCORD_WEBHOOK_URL = val
 
 def save_webhook(url):
     global DISCORD_WEBHOOK_URL
     DISCORD_WEBHOOK_URL = url
-    try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump({"webhook": url}, f)
-    except: pass
-
-load_webhook()
+    config.update(webhook=url)
 
 COLORS = {
     "bg": "#18181b",
@@ -110,14 +80,13 @@ class SnippingTool(tk.Toplevel):
         x1 = min(self.start_x, event.x); y1 = min(self.start_y, event.y)
         x2 = max(self.start_x, event.x); y2 = max(self.start_y, event.y)
         if abs(x2-x1) < 5 or abs(y2-y1) < 5: self.destroy(); return
-        self.destroy()
-        self.parent.withdraw()
-        time.sleep(0.2)
-        try:
-            img = ImageGrab.grab((x1, y1, x2, y2))
-            self.parent.deiconify()
-            self.callback(img)
-        except: self.parent.deiconify()
+        import capture
+        parent, callback = self.parent, self.callback
+        def done(img):
+            parent.deiconify()
+            callback(img, (x1, y1, x2, y2))
+        # grabbed off the UI thread once both the snip veil and the overlay are really off screen
+        capture.grab_async(parent, (x1, y1, x2, y2), done, lambda e: parent.deiconify(), hide=(parent,), destroy=(self,))
 
 class StormOverlay(ctk.CTk):
     def __init__(self):
@@ -136,107 +105,58 @@ class StormOverlay(ctk.CTk):
         self.comp_img = None
         self.extracted_data = {}
         self.report_box = None # Initialize placeholder
+        # last snipped rectangles, kept for watch mode
+        self.rects = {k: tuple(b) for k, b in config.get("watch_rects", {}).items()}
+        self.watcher = None
+        self.last_result = None
+        self.last_speed = 60.0  # storm speed of the last calculation, reused by watch mode
 
         self.canvas = tk.Canvas(self, bg=COLORS["bg"], highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
 
-        self.stars = []
-        self.comets = []
-        self.mouse_x = -500
-        self.mouse_y = -500
-
-        for _ in range(120):
-            x = random.randint(0, 500)
-            y = random.randint(0, 800)
-            size = random.uniform(0.5, 2.0)
-            alpha = random.uniform(0.2, 0.9)
-            pulse_speed = random.uniform(0.005, 0.02) * random.choice([-1, 1])
-            color = self._hex(int(30 + (alpha * 225)))
-            sid = self.canvas.create_oval(x, y, x+size, y+size, fill=color, outline="", tags="star")
-            self.stars.append([sid, alpha, pulse_speed])
+        self.backdrop = anim.Backdrop(self, self.canvas)
 
         self.canvas.bind("<Motion>", self.on_mouse_move)
         self.canvas.bind("<ButtonPress-1>", self.start_move)
         self.canvas.bind("<B1-Motion>", self.do_move)
 
-        self.animate()
+        self.backdrop.start()
+        if os.getenv("VORTEX_TRACE_HUD") and tracing.enabled(): self.hud = tracing.Hud(self, self.canvas)
         self.show_landing()
         self.animate_fade_in()
         self.after(1000, self.check_webhook)
+        self.after(100, lambda: threading.Thread(target=self.warm_up, daemon=True).start())
+        if os.getenv("VORTEX_STARTUP_PROBE"): self.after(0, self.startup_probe)
 
-    def _hex(self, val):
-        val = max(0, min(255, int(val)))
-        return f"#{val:02x}{val:02x}{val:02x}"
+    def warm_up(self):
+        """Import the heavy modules and load/benchmark the OCR engine off the UI thread."""
+        try:
+            import engine, ocr, backends, capture
+            backends.get_backend()
+            capture.get_backend()
+            self.get_uploader()  # starts sending reports spooled by an earlier session
+        except Exception as e:
+            print(f"Warm-up failed: {e}")
 
-    def on_mouse_move(self, event):
-        self.mouse_x = event.x
-        self.mouse_y = event.y
+    def startup_probe(self):
+        # used by bench_startup.py: report when the first frame is on screen, then quit
+        self.update_idletasks()
+        print(json.dumps({"first_frame": time.time(), "imports_done": _T0}), flush=True)
+        self.destroy()
 
-    def animate(self):
-        # Safety check if widget destroyed
-        try:
-            w = self.winfo_width()
-            h = self.winfo_height()
-        except: return 
-
-        self.canvas.delete("bg_anim")
-
-        radius = 25
-        steps = 5
-        base = 39
-        for i in range(steps):
-            r = radius * (1 - (i/steps))
-            intensity = base + (50 * (i/steps))
-            col = self._hex(intensity)
-            self.canvas.create_oval(
-                self.mouse_x - r, self.mouse_y - r,
-                self.mouse_x + r, self.mouse_y + r,
-                fill=col, outline="", tags="bg_anim"
-            )
-
-        for s in self.stars:
-            sid, alpha, speed = s
-            alpha += speed
-            if alpha >= 1.0:
-                alpha = 1.0
-                speed = -abs(speed)
-            elif alpha <= 0.15:
-                alpha = 0.15
-                speed = abs(speed)
-            s[1] = alpha
-            s[2] = speed
-            val = int(30 + (alpha * 225))
-            self.canvas.itemconfig(sid, fill=self._hex(val))
-        self.canvas.tag_lower("star")
-
-        if random.random() < 0.015:
-            sx = random.choice([0, w])
-            sy = random.randint(0, h//2)
-            ex = w if sx == 0 else 0
-            ey = sy + random.randint(50, 200)
-            vx = (ex - sx) / 60; vy = (ey - sy) / 60
-            self.comets.append([None, sx, sy, vx, vy, 60])
-
-        for c in self.comets[:]:
-            cid, x, y, vx, vy, life = c
-            x += vx; y += vy
-            self.canvas.create_line(x, y, x-(vx*10), y-(vy*10), fill="#e4e4e7", width=1, tags="bg_anim")
-            c[1] = x; c[2] = y; c[5] -= 1
-            if c[5] <= 0: self.comets.remove(c)
-
-        self.canvas.tag_lower("bg_anim")
-        self.canvas.tag_lower("star")
-        self.after(16, self.animate)
+    def on_mouse_move(self, event):
+        self.backdrop.on_mouse(event.x, event.y)
 
     def start_move(self, event): self.x, self.y = event.x, event.y
     def do_move(self, event): self.geometry(f"+{self.winfo_x() + event.x - self.x}+{self.winfo_y() + event.y - self.y}")
 
-    def smooth_transition(self, target_w, target_h):
+    def smooth_transition(self, target_w, target_h, on_done=None):
         cx = self.winfo_x() + (self.width / 2)
         cy = self.winfo_y() + (self.height / 2)
         start_w, start_h = self.width, self.height
         start_time = time.time()
         duration = 0.6
+        sp = tracing.begin("transition")
         self.attributes('-alpha', 0.95)
 
         def _step():
@@ -246,6 +166,8 @@ class StormOverlay(ctk.CTk):
                 self.geometry(f"{target_w}x{target_h}+{int(cx - target_w/2)}+{int(cy - target_h/2)}")
                 self.width, self.height = target_w, target_h
                 self.attributes('-alpha', 1.0)
+                sp.end()
+                if on_done: on_done()
                 return
             ease = 1 - math.pow(1 - progress, 3)
             new_w = int(start_w + (target_w - start_w) * ease)
@@ -259,13 +181,12 @@ class StormOverlay(ctk.CTk):
 
     def run_ocr(self):
         try:
+            import ocr
             t_start = time.time()
-            txt_t = pytesseract.image_to_string(self.preprocess(self.thermo_img), config='--psm 6')
-            txt_c = pytesseract.image_to_string(self.preprocess(self.comp_img), config='--psm 6')
-            self.parse_data(txt_t + "\n" + txt_c)
+            self.extracted_data = ocr.read_pair(self.thermo_img, self.comp_img)
             elapsed = time.time() - t_start
             if elapsed < 1.0:
-                time.sleep(1.0 - elapsed)
+                with tracing.span("min_display_wait"): time.sleep(1.0 - elapsed)
             self.after(0, self.show_verify)
         except Exception as e:
             print(e)
@@ -285,17 +206,23 @@ class StormOverlay(ctk.CTk):
         _fade()
 
     def clear_ui(self):
+        # a debounced preview must not fire into entries that are about to be destroyed
+        if getattr(self, "preview_job", None) is not None:
+            self.after_cancel(self.preview_job)
+            self.preview_job = None
         for child in self.canvas.winfo_children():
             child.destroy()
         self.canvas.delete("ui")
 
     def check_webhook(self):
         global DISCORD_WEBHOOK_URL
+        load_webhook()
         if not DISCORD_WEBHOOK_URL:
              # Just a console warning if missing, allows running without it
              print("Warning: Webhook not set.")
 
     def show_landing(self):
+        self.stop_watch()
         self.clear_ui()
         self.smooth_transition(360, 240)
         self.canvas.create_text(20, 20, text="VORTEX // ENGINE", font=("Helvetica", 10, "bold"), fill=COLORS["subtext"], anchor="nw", tags="ui")
@@ -326,18 +253,24 @@ class StormOverlay(ctk.CTk):
                                     command=self.start_ocr)
         self.canvas.create_window(180, 205, window=self.btn_go, tags="ui")
 
-    def handle_thermo(self, img):
+    def remember_rect(self, name, bbox):
+        self.rects[name] = bbox
+        config.update(watch_rects=self.rects)
+
+    def handle_thermo(self, img, bbox=None):
         self.thermo_img = img
+        if bbox: self.remember_rect("thermo", bbox)
         self.btn_t.configure(fg_color=COLORS["accent"], text_color="black", border_color=COLORS["accent"])
         self.check_ready()
 
-    def handle_comp(self, img):
+    def handle_comp(self, img, bbox=None):
         self.comp_img = img
+        if bbox: self.remember_rect("comp", bbox)
         self.btn_c.configure(fg_color=COLORS["accent"], text_color="black", border_color=COLORS["accent"])
         self.check_ready()
 
     def check_ready(self):
-        if self.thermo_img and self.comp_img:
+        if self.thermo_img is not None and self.comp_img is not None:
             self.btn_go.configure(state="normal", fg_color=COLORS["text"], text_color="black")
 
     def start_ocr(self):
@@ -345,54 +278,16 @@ class StormOverlay(ctk.CTk):
         threading.Thread(target=self.run_ocr, daemon=True).start()
 
     def preprocess(self, pil_img):
-        img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-        return thresh
+        import ocr
+        return ocr.preprocess(pil_img)
 
     def parse_data(self, text):
-        text = text.replace("Q", "0").replace("O", "0").replace("o", "0")
-        text = text.replace("@", "0").replace("Ø", "0").replace("D", "0")
-        text = text.replace("theta", "0")
-
-        def find(patterns):
-            for p in patterns:
-                match = re.search(p + r".*?(\d[\d\.]*)", text, re.IGNORECASE)
-                if match: return match.group(1).rstrip('.')
-            return ""
-
-        raw_pwat = find([r"PWAT"])
-        if raw_pwat:
-            if re.match(r"^7\.\d+$", raw_pwat): raw_pwat = "1" + raw_pwat[1:]
-            try:
-                f = float(raw_pwat)
-                f = round(f, 1)
-                if f > 4.0:
-                    if f == 7.0: f = 1.0
-                    elif f >= 10: f = f / 10
-                    else: f = 1.5
-                raw_pwat = str(f)
-            except: pass
-
-        self.extracted_data = {
-            "temp": find([r"TEMPERATURE", r"TEMP"]),
-            "dew": find([r"DEW\s*P[O0Q@ØoD]INT", r"P[O0Q@ØoD]INT", r"DEWPOINT", r"DEW"]),
-            "3cape": find([r"3\s*CAPE", r"3CAPE"]),
-            "cape": find([r"(?<!3)CAPE"]),
-            "lapse": find([r"0-3\s*[Kk]?[Mm]?\s*LAPSE", r"0-3\s*LAPSE", r"0-3"]),
-            "srh": find([r"SRH"]),
-            "rh": find([r"SURFACE\s*RH", r"SFC\s*RH"]),
-            "mid_rh": find([r"MB\s*RH", r"500\s*MB", r"MID\s*RH"]),
-            "pwat": raw_pwat,
-            "stp": find([r"STP", r"SIP", r"S\.T\.P", r"3TP", r"3\s*T\s*P"]), 
-            "vtp": find([r"VTP", r"VIP", r"V\.T\.P", r"3TP", r"3\s*T\s*P"]), 
-            "raw": text
-        }
+        import ocr
+        self.extracted_data = ocr.parse_data(text)
 
     def show_verify(self):
         self.clear_ui()
-        self.smooth_transition(400, 680) 
+        self.smooth_transition(400, 760, on_done=lambda: tracing.end_run("ocr"))
         self.canvas.create_text(20, 20, text="VERIFY", font=("Helvetica", 14, "bold"), fill="white", anchor="nw", tags="ui")
         
         # feedback 
@@ -424,16 +319,64 @@ class StormOverlay(ctk.CTk):
             row.grid(row=r, column=c, padx=5, pady=5)
             row.pack_propagate(False)
             ctk.CTkLabel(row, text=label, font=("Helvetica", 9, "bold"), text_color=COLORS["subtext"]).pack(side="left", padx=10)
-            entry = ctk.CTkEntry(row, font=("Helvetica", 14), fg_color="transparent", border_width=0, text_color="white", width=80)
+            # shaky label/number matches show up red so they get checked first
+            low = self.extracted_data.get("conf", {}).get(key, 1.0) < 0.8
+            entry = ctk.CTkEntry(row, font=("Helvetica", 14), fg_color="transparent", border_width=0,
+                                 text_color=COLORS["danger"] if low else "white", width=80)
             if key != "speed": entry.insert(0, self.extracted_data.get(key, ""))
             else: entry.configure(placeholder_text="60")
             entry.pack(side="right", padx=5)
+            entry.bind("<KeyRelease>", lambda e, k=key: self.schedule_preview(k))
             self.entries[key] = entry
-        btn_run = ctk.CTkButton(self.canvas, text="Calculate", height=45, width=300, corner_radius=22,
+        self.build_preview(525)
+        self.btn_run = ctk.CTkButton(self.canvas, text="Calculate", height=45, width=300, corner_radius=22,
                        fg_color=COLORS["accent"], text_color="black", hover_color=COLORS["accent_hover"],
                        font=("Helvetica", 14, "bold"),
                        command=self.calc)
-        self.canvas.create_window(200, 640, window=btn_run, tags="ui")
+        self.canvas.create_window(200, 715, window=self.btn_run, tags="ui")
+
+    def build_preview(self, y):
+        """Live scores under the verify form; refresh_preview() moves these items instead of redrawing."""
+        import engine
+        self.live = engine.Live(engine.to_values({k: e.get() for k, e in self.entries.items()}))
+        self.preview_dirty, self.preview_job = set(), None
+        self.canvas.create_text(20, y, text="PREVIEW", font=("Helvetica", 10, "bold"), fill=COLORS["subtext"], anchor="nw", tags="ui")
+        self.preview = {"ef": self.canvas.create_text(380, y - 4, text="", font=("Helvetica", 18, "bold"), fill="white", anchor="ne", tags="ui"),
+                        "cond": self.canvas.create_text(20, y + 20, text="", font=("Helvetica", 9), fill=COLORS["subtext"], anchor="nw", tags="ui")}
+        cols = {"Wedge":"#f38ba8", "Stovepipe":"#89b4fa", "Drillbit":"#94e2d5", "Sidewinder":"#a6e3a1", "Cone":"#cba6f7", "Rope":"#6c7086"}
+        for i, n in enumerate(engine.SHAPES):
+            x0 = 30 if i % 2 == 0 else 215
+            x1, by = x0 + 155, y + 62 + (i // 2) * 30
+            self.canvas.create_text(x0, by, text=n.upper(), font=("Helvetica", 9, "bold"), fill=COLORS["subtext"], anchor="sw", tags="ui")
+            pct = self.canvas.create_text(x1, by, text="", font=("Helvetica", 9, "bold"), fill="white", anchor="se", tags="ui")
+            self.canvas.create_line(x0, by + 6, x1, by + 6, fill="#313244", width=6, capstyle=tk.ROUND, tags="ui")
+            bar = self.canvas.create_line(x0, by + 6, x0, by + 6, fill=cols.get(n, "white"), width=6, capstyle=tk.ROUND, tags="ui")
+            self.preview[n] = (pct, bar, x0, x1 - x0, by + 6)
+        self.refresh_preview(self.live.update({}))
+
+    def schedule_preview(self, key):
+        # typing bursts collapse into one rescore shortly after the last key
+        self.preview_dirty.add(key)
+        if self.preview_job is not None: self.after_cancel(self.preview_job)
+        self.preview_job = self.after(120, self.update_preview)
+
+    def update_preview(self):
+        import engine
+        self.preview_job = None
+        changed = engine.to_values({k: self.entries[k].get() for k in self.preview_dirty})
+        self.preview_dirty = set()
+        with tracing.span("preview"): self.refresh_preview(self.live.update(changed))
+
+    def refresh_preview(self, r):
+        import engine
+        self.canvas.itemconfigure(self.preview["ef"], text=engine.EF_LABELS[int(r["ef"][0])])
+        self.canvas.itemconfigure(self.preview["cond"],
+                                  text=f"MULTI-VORTEX {float(r['Multi-Vortex'][0]):.0f}%   RAIN WRAPPED {float(r['Rain Wrapped'][0]):.0f}%")
+        for n in engine.SHAPES:
+            pct, bar, x0, w, by = self.preview[n]
+            p = float(r["shapes"][n][0])
+            self.canvas.itemconfigure(pct, text=f"{p:.1f}%")
+            self.canvas.coords(bar, x0, by, x0 + max(0.1, p / 100 * w), by)
 
     def send_user_report(self):
         """Prepares the user message and sends the report."""
@@ -446,84 +389,133 @@ class StormOverlay(ctk.CTk):
         threading.Thread(target=self._send_report_to_webhook, args=(user_message,), daemon=True).start()
 
     def _send_report_to_webhook(self, message):
-        """Actual logic for sending data and message to Discord."""
+        """Spools the report; the uploader thread sends it (and retries it later if offline)."""
         try:
-            files = {}
-            for name, img in [("t.png", self.thermo_img), ("c.png", self.comp_img)]:
-                b = BytesIO(); img.save(b, "PNG"); b.seek(0)
-                files[name] = (name, b, "image/png")
-                
             embeds = [{
                 "title": "VORTEX OCR Error Report",
                 "description": f"**User Feedback:**\n> {message}\n\n**Raw OCR Data:**\n```\n{self.extracted_data.get('raw', 'N/A')[:1000]}```",
                 "color": 16777215 
             }]
-            
-            payload = {"embeds": embeds}
-            requests.post(DISCORD_WEBHOOK_URL, files=files, data={"payload_json": json.dumps(payload)})
-            self.after(0, lambda: messagebox.showinfo("Success", "Report Sent."))
+            import capture
+            self.get_uploader().submit({"embeds": embeds}, [("t", capture.to_pil(self.thermo_img)), ("c", capture.to_pil(self.comp_img))])
         except Exception as e: 
             print(f"Webhook error: {e}")
             self.after(0, lambda: messagebox.showerror("Error", "Failed to send report."))
 
+    _uploader_lock = threading.Lock()
+
+    def get_uploader(self):
+        with self._uploader_lock:
+            if getattr(self, "uploader", None) is None:
+                import uploader
+                self.report_warned = set()
+                self.uploader = uploader.Uploader(lambda: DISCORD_WEBHOOK_URL, on_result=self._report_result)
+        return self.uploader
+
+    def _report_result(self, rid, ok, err):
+        # dialogs only for reports filed in this session, and one warning each; retries just log
+        mine = rid in self.uploader.submitted
+        if ok:
+            print(f"Report {rid} sent.")
+            if mine: self.after(0, lambda: messagebox.showinfo("Success", "Report Sent."))
+            return
+        print(f"Webhook error ({rid}): {err}")
+        if mine and not self.uploader.spooled(rid):
+            self.after(0, lambda: messagebox.showerror("Report", f"Could not send the report:\n{err}"))
+        elif mine and rid not in self.report_warned:
+            self.report_warned.add(rid)
+            self.after(0, lambda: messagebox.showwarning("Report", "Could not send the report yet; it was saved and will be retried."))
+
     def calc(self):
         try:
-            def g(k):
-                if k not in self.entries: return 0.0
-                val = self.entries[k].get().replace(',', '.')
-                val = re.sub(r"[^0-9.]", "", val)
-                return float(val) if val else 0.0
-            v = {k: g(k) for k in self.entries}
+            import engine
+            v = engine.to_values({k: e.get() for k, e in self.entries.items()})
             if not self.entries.get("speed") or not self.entries["speed"].get():
                 v["speed"] = 60.0
-            def sc(val, mn, mx, mp):
-                return 0 if val<=mn else mp if val>=mx else ((val-mn)/(mx-mn))*mp
-            sh = {"Wedge":10, "Stovepipe":10, "Drillbit":3, "Sidewinder":5, "Cone":10, "Rope":10}
-            constriction = sc(v["lapse"], 7.0, 10.0, 1.0)
-            if v["rh"] < 45 and v["lapse"] > 10.5:
-                dryness_score = sc(45 - v["rh"], 0, 25, 40)
-                lapse_score = sc(v["lapse"], 10.5, 12.5, 40)
-                sh["Drillbit"] += dryness_score + lapse_score
-            sh["Wedge"] += sc(15-(v["temp"]-v["dew"]), 0, 10, 50) + sc(v["rh"], 60, 100, 60)
-            if v["mid_rh"] > 60:
-                sh["Wedge"] += sc(v["mid_rh"], 60, 95, 30)
-            wedgePenalty = sc(v["lapse"], 8.5, 10.0, 15)
-            if v["cape"] > 5000: wedgePenalty = 0; sh["Wedge"] += 20
-            sh["Wedge"] = max(5, sh["Wedge"] - wedgePenalty)
-            sh["Stovepipe"] += (sc(v["lapse"], 6.5, 8.0, 30) - sc(v["lapse"], 9.2, 11.0, 30)) + sc(v["rh"], 50, 85, 40)
-            sh["Sidewinder"] += sc(v["vtp"], 1, 6, 50) + (constriction * 25)
-            if v["stp"] > 5:
-                bst = sc(v["stp"], 5, 25, 40)
-                if constriction > 0.7:
-                    if sh["Drillbit"] > 0: sh["Drillbit"] += bst*0.8
-                    sh["Stovepipe"] += bst*0.4
-                else:
-                    sh["Wedge"] += bst*0.9
-                    sh["Stovepipe"] += bst*0.4
-            mv = min(95, 5 + sc(v["srh"], 200, 800, 80) + sc(v["stp"], 5, 25, 20))
-            rain = min(100, 10 + sc(v["pwat"], 1.0, 2.5, 70) + sc(v["rh"], 60, 100, 20))
-            pwr = ((v["cape"]*v["srh"])/250000) + (v["stp"]*0.7) + (constriction*1.5)
-            ef = "EF0"; ef = "EF1" if pwr>1.5 else ef; ef = "EF2" if pwr>3.0 else ef
-            ef = "EF3" if pwr>5.0 else ef; ef = "EF4" if pwr>8.0 else ef; ef = "EF5" if pwr>13.0 else ef
-            self.show_res(sh, mv, rain, ef)
         except Exception as e:
             messagebox.showerror("Error", f"Crash Reason:\n{e}")
+            return
+        self.last_speed = v["speed"]
+        self.btn_run.configure(text="CALCULATING...", state="disabled")
+        # the ensemble and the analog search take tens of ms; keep them off the Tk thread
+        imgs = (self.thermo_img, self.comp_img)
+        threading.Thread(target=self._calc_worker, args=(v, imgs), daemon=True).start()
+
+    def _calc_worker(self, v, imgs):
+        try:
+            import engine
+            with tracing.span("calc"):
+                sh, mv, rain, ef = engine.score_one(v)
+                bands = None
+                n = config.get("ensemble_samples", 100_000)
+                if n:
+                    import ensemble
+                    bands = ensemble.run(v, n)
+            with tracing.span("history"): analogs = self.record_history(v, (sh, mv, rain, ef), imgs)
+        except Exception as e:
+            self.after(0, lambda: self._calc_failed(e))
+            return
+        self.after(0, lambda: self._calc_done(sh, mv, rain, ef, bands, analogs))
+
+    def _calc_done(self, *result):
+        with tracing.span("show_res"): self.show_res(*result)
+        tracing.end_run("calc")
+
+    def _calc_failed(self, e):
+        try: self.btn_run.configure(text="Calculate", state="normal")
+        except Exception: pass  # verify form already gone
+        messagebox.showerror("Error", f"Crash Reason:\n{e}")
+
+    def record_history(self, v, result, imgs):
+        """Look up the closest past cases, then append this run to the history store (called off the UI thread)."""
+        try:
+            import cache, history
+            import numpy as np
+            h = history.get()
+            analogs = [h.row(i) for i, _ in h.analogs(v, 3)]
+            hashes = [cache.image_key(np.asarray(im)) if im is not None else "" for im in imgs]
+            h.append(v, result, hashes)
+            return analogs
+        except Exception as e:
+            print(f"History error: {e}")
+            return []
 
-    def show_res(self, sh, mv, rain, ef):
+    def show_res(self, sh, mv, rain, ef, bands=None, analogs=None):
+        self.last_result = (sh, mv, rain, ef, bands, analogs)
         self.clear_ui()
         self.canvas.create_text(20, 20, text="INTENSITY", font=("Helvetica", 10, "bold"), fill=COLORS["subtext"], anchor="nw", tags="ui")
         self.canvas.create_text(20, 40, text=ef, font=("Helvetica", 64, "bold"), fill="white", anchor="nw", tags="ui")
+        if bands:
+            probs = sorted(bands["ef_prob"].items(), key=lambda x: x[1], reverse=True)[:3]
+            self.canvas.create_text(20, 125, text="   ".join(f"{k} {p:.0%}" for k, p in probs if p >= 0.005),
+                                    font=("Helvetica", 9), fill=COLORS["subtext"], anchor="nw", tags="ui")
         btn_reset = ctk.CTkButton(self.canvas, text="Reset", height=30, width=80, corner_radius=15,
                        fg_color="transparent", border_width=1, border_color=COLORS["subtext"],
                        text_color=COLORS["subtext"], hover_color=COLORS["border"],
                        command=self.show_landing)
         self.canvas.create_window(350, 40, window=btn_reset, tags="ui")
+        watching = self.watcher is not None and self.watcher.running
+        btn_watch = ctk.CTkButton(self.canvas, text="Stop" if watching else "Watch", height=30, width=80, corner_radius=15,
+                       fg_color="transparent", border_width=1,
+                       border_color=COLORS["success"] if watching else COLORS["subtext"],
+                       text_color=COLORS["success"] if watching else COLORS["subtext"], hover_color=COLORS["border"],
+                       state="normal" if {"thermo", "comp"} <= set(self.rects) else "disabled",
+                       command=self.toggle_watch)
+        self.canvas.create_window(350, 80, window=btn_watch, tags="ui")
+        if watching:
+            self.canvas.create_text(310, 110, text="● LIVE", font=("Helvetica", 9, "bold"), fill=COLORS["success"], anchor="nw", tags="ui")
         y_start = 160
         x_left = 30
         x_right = 370
         bar_width = x_right - x_left
         tot = sum(sh.values())
         s_sh = sorted([(k, (v/tot)*100) for k,v in sh.items()], key=lambda x: x[1], reverse=True)
+        def draw_band(name, y):
+            # 5th-95th percentile of the ensemble under the bar
+            if not bands or name not in bands["bands"]: return
+            b = bands["bands"][name]
+            self.canvas.create_line(x_left + b[5] / 100 * bar_width, y + 15, x_left + b[95] / 100 * bar_width, y + 15,
+                                    fill=COLORS["subtext"], width=2, tags="ui")
         cols = {"Wedge":"#f38ba8", "Stovepipe":"#89b4fa", "Drillbit":"#94e2d5", "Sidewinder":"#a6e3a1", "Cone":"#cba6f7", "Rope":"#6c7086"}
         for n, p in s_sh:
             self.canvas.create_text(x_left, y_start, text=n.upper(), font=("Helvetica", 11, "bold"), fill=COLORS["subtext"], anchor="sw", tags="ui")
@@ -532,6 +524,7 @@ class StormOverlay(ctk.CTk):
             fill_len = max(0.1, (p / 100) * bar_width)
             if p > 0:
                 self.canvas.create_line(x_left, y_start+8, x_left + fill_len, y_start+8, fill=cols.get(n, "white"), width=8, capstyle=tk.ROUND, tags="ui")
+            draw_band(n, y_start)
             y_start += 40
         y_start += 10
         self.canvas.create_text(x_left, y_start, text="CONDITIONS", font=("Helvetica", 11, "bold"), fill=COLORS["subtext"], anchor="sw", tags="ui")
@@ -543,12 +536,59 @@ class StormOverlay(ctk.CTk):
             fill_len = max(0.1, (val / 100) * bar_width)
             if val > 0:
                 self.canvas.create_line(x_left, y+8, x_left + fill_len, y+8, fill=color, width=8, capstyle=tk.ROUND, tags="ui")
+            draw_band(name, y)
         draw_cond("Multi-Vortex", mv, "#fab387", y_start)
         draw_cond("Rain Wrapped", rain, "#f9e2af", y_start + 40)
+        if analogs:
+            y = y_start + 80
+            self.canvas.create_text(x_left, y, text="ANALOGS", font=("Helvetica", 11, "bold"), fill=COLORS["subtext"], anchor="sw", tags="ui")
+            for a in analogs:
+                y += 20
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(a["ts"]))
+                self.canvas.create_text(x_left, y, text=when, font=("Helvetica", 10), fill=COLORS["subtext"], anchor="sw", tags="ui")
+                self.canvas.create_text(x_right, y, text=f"{a['ef_label']}  CAPE {a['cape']:.0f}  SRH {a['srh']:.0f}",
+                                        font=("Helvetica", 10, "bold"), fill="white", anchor="se", tags="ui")
+
+    def toggle_watch(self):
+        if self.watcher is not None and self.watcher.running: self.stop_watch()
+        else: self.start_watch()
+        if self.last_result: self.show_res(*self.last_result)
+
+    def start_watch(self):
+        """Re-grab the saved rectangles every few seconds; OCR and rescore only when a panel changed."""
+        import watch
+        # the verify form (and its speed entry) is gone by the time Watch can be pressed
+        self.watcher = watch.Watcher(self.rects, interval=config.get("watch_interval", 2.0), speed=self.last_speed,
+                                     on_update=lambda d, r, f: self.after(0, lambda: self._watch_update(d, r, f)),
+                                     on_error=lambda e: print(f"Watch error: {e}"))
+        self.watcher.start()
+
+    def stop_watch(self):
+        if self.watcher is not None: self.watcher.stop()
+
+    def _watch_update(self, data, result, frames):
+        if self.watcher is None or not self.watcher.running: return
+        self.extracted_data = data
+        self.thermo_img, self.comp_img = frames["thermo"], frames["comp"]
+        self.show_res(*result)
 
     def clear_frame(self):
         for w in self.scroll_container.winfo_children(): w.destroy()
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        import batch
+        batch.main(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "backtest":
+        import backtest
+        backtest.main(sys.argv[2:])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        import server
+        server.main(sys.argv[2:])
+        sys.exit(0)
     app = StormOverlay()
     app.mainloop()
@@ -0,0 +1,195 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Starfield / mouse glow / comet background for the overlay canvas.
+
+Retained mode: every canvas item is created once and afterwards only moved,
+recoloured or hidden. Stars are recoloured only when their (quantised) shade
+actually changes. The tick rate adapts to a per-frame work budget, drops to a
+slower idle rate when nothing is moving, and the loop parks entirely while
+the window is minimized, hidden or unfocused. Motion is scaled by real
+elapsed time, so a slower tick doesn't slow the animation down.
+"""
+
+import random
+import time
+from collections import deque
+
+
+HEX = [f"#{v:02x}{v:02x}{v:02x}" for v in range(256)]
+BASE_MS = 16      # ~60 fps
+MAX_MS = 66       # don't degrade below ~15 fps
+IDLE_MS = 33      # no mouse motion and no comets
+PARKED_MS = 250   # poll interval while paused
+IDLE_AFTER = 2.0  # seconds without mouse motion
+COMET_POOL = 6
+GLOW_STEPS = 5
+
+
+class Backdrop:
+    def __init__(self, root, canvas, n_stars=120, budget_ms=6.0):
+        self.root = root
+        self.canvas = canvas
+        self.budget_ms = budget_ms
+        self.interval = BASE_MS
+        self.running = False
+        self.paused = False
+        self.mouse_x = self.mouse_y = -500
+        self.mouse_moved = True
+        self.last_motion = time.perf_counter()
+        self.last_tick = None
+        self.work_ms = deque(maxlen=240)
+        self.frame_ms = deque(maxlen=240)
+        self.star_updates = 0
+        self.ema = 0.0
+
+        self.stars = []
+        for _ in range(n_stars):
+            x = random.randint(0, 500)
+            y = random.randint(0, 800)
+            size = random.uniform(0.5, 2.0)
+            alpha = random.uniform(0.2, 0.9)
+            pulse_speed = random.uniform(0.005, 0.02) * random.choice([-1, 1])
+            shade = int(30 + alpha * 225) & ~3
+            sid = canvas.create_oval(x, y, x + size, y + size, fill=HEX[shade], outline="", tags=("bg", "star"))
+            self.stars.append([sid, alpha, pulse_speed, shade])
+
+        self.glow = []
+        for i in range(GLOW_STEPS):
+            col = HEX[int(39 + 50 * (i / GLOW_STEPS))]
+            self.glow.append(canvas.create_oval(-600, -600, -600, -600, fill=col, outline="", tags=("bg", "glow")))
+
+        self.comets = []  # [item, x, y, vx, vy, life_ms, active]
+        for _ in range(COMET_POOL):
+            cid = canvas.create_line(0, 0, 0, 0, fill="#e4e4e7", width=1, state="hidden", tags=("bg", "comet"))
+            self.comets.append([cid, 0.0, 0.0, 0.0, 0.0, 0.0, False])
+        canvas.tag_lower("bg")
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.last_tick = time.perf_counter()
+        self.root.after(self.interval, self._tick)
+
+    def stop(self):
+        self.running = False
+
+    def on_mouse(self, x, y):
+        self.mouse_x, self.mouse_y = x, y
+        self.mouse_moved = True
+        self.last_motion = time.perf_counter()
+
+    def _visible(self):
+        try:
+            if self.root.state() in ("iconic", "withdrawn") or not self.root.winfo_viewable(): return False
+            return self.root.focus_displayof() is not None
+        except Exception:
+            return False
+
+    def _tick(self):
+        if not self.running: return
+        try:
+            if not self._visible():
+                self.paused = True
+                self.root.after(PARKED_MS, self._tick)
+                return
+        except Exception:
+            return  # window destroyed
+        now = time.perf_counter()
+        dt = min((now - self.last_tick) * 1000, 100.0)
+        if self.paused:
+            self.paused = False
+            dt = BASE_MS  # don't jump after a pause
+        self.last_tick = now
+        self.frame_ms.append(dt)
+        try:
+            active = self._draw(dt / BASE_MS)
+        except Exception:
+            return  # canvas destroyed
+        work = (time.perf_counter() - now) * 1000
+        self.work_ms.append(work)
+        self._adapt(work, active)
+        self.root.after(int(self.interval), self._tick)
+
+    def _draw(self, k):
+        c = self.canvas
+        if self.mouse_moved:
+            radius = 25
+            for i, gid in enumerate(self.glow):
+                r = radius * (1 - (i / GLOW_STEPS))
+                c.coords(gid, self.mouse_x - r, self.mouse_y - r, self.mouse_x + r, self.mouse_y + r)
+            self.mouse_moved = False
+
+        for s in self.stars:
+            alpha = s[1] + s[2] * k
+            if alpha >= 1.0:
+                alpha = 1.0
+                s[2] = -abs(s[2])
+            elif alpha <= 0.15:
+                alpha = 0.15
+                s[2] = abs(s[2])
+            s[1] = alpha
+            shade = int(30 + alpha * 225) & ~3  # 4-step shades: invisible, but ~4x fewer itemconfigs
+            if shade != s[3]:
+                s[3] = shade
+                c.itemconfig(s[0], fill=HEX[shade])
+                self.star_updates += 1
+
+        w = self.root.winfo_width()
+        h = self.root.winfo_height()
+        if random.random() < 0.015 * k:
+            for cm in self.comets:
+                if cm[6]: continue
+                sx = random.choice([0, w])
+                sy = random.randint(0, max(1, h // 2))
+                ex = w if sx == 0 else 0
+                ey = sy + random.randint(50, 200)
+                cm[1:] = [sx, sy, (ex - sx) / 60, (ey - sy) / 60, 60 * BASE_MS, True]
+                c.itemconfigure(cm[0], state="normal")
+                break
+
+        active = False
+        for cm in self.comets:
+            if not cm[6]: continue
+            cid, x, y, vx, vy = cm[:5]
+            x += vx * k
+            y += vy * k
+            cm[1], cm[2] = x, y
+            cm[5] -= k * BASE_MS
+            if cm[5] <= 0:
+                cm[6] = False
+                c.itemconfigure(cid, state="hidden")
+                continue
+            c.coords(cid, x, y, x - (vx * 10), y - (vy * 10))
+            active = True
+        return active
+
+    def _adapt(self, work, active):
+        self.ema = work if len(self.work_ms) == 1 else self.ema * 0.9 + work * 0.1
+        if self.ema > self.budget_ms:
+            self.interval = min(MAX_MS, self.interval * 1.25)
+        elif self.ema < self.budget_ms / 2:
+            self.interval = max(BASE_MS, self.interval * 0.9)
+        idle = not active and time.perf_counter() - self.last_motion > IDLE_AFTER
+        if idle: self.interval = max(self.interval, IDLE_MS)
+
+    def stats(self):
+        """Frame-time stats over the last ~240 frames (ms)."""
+        def pct(xs, p):
+            if not xs: return 0.0
+            xs = sorted(xs)
+            return xs[min(len(xs) - 1, int(len(xs) * p))]
+        frames = list(self.frame_ms)
+        work = list(self.work_ms)
+        mean = sum(frames) / len(frames) if frames else 0.0
+        return {
+            "fps": 1000 / mean if mean else 0.0,
+            "interval_ms": self.interval,
+            "frame_ms_mean": mean,
+            "work_ms_mean": sum(work) / len(work) if work else 0.0,
+            "work_ms_p95": pct(work, 0.95),
+            "work_ms_max": max(work) if work else 0.0,
+            "star_updates": self.star_updates,
+            "paused": self.paused,
+        }
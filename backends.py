@@ -0,0 +1,237 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""OCR engines. Each backend turns thresholded images into text; the fastest
+one that works here is picked once per session by a short benchmark.
+
+- tesserocr:  in-process libtesseract binding, a pool of warmed APIs (one per thread)
+- list:       one tesseract process per batch of images (model loaded once per call)
+- cli:        pytesseract, one tesseract process per image (the old behaviour)
+
+Set VORTEX_OCR_BACKEND to force one by name.
+"""
+
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytesseract
+
+import config
+
+
+def get_tesseract_cmd():
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, "Tesseract-OCR", "tesseract.exe")
+
+    local_tess = os.path.join(os.getcwd(), "Tesseract-OCR", "tesseract.exe")
+    if os.path.exists(local_tess):
+        return local_tess
+
+    paths = [
+        r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+        r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+        os.path.join(os.getenv('LOCALAPPDATA', ''), 'Tesseract-OCR', 'tesseract.exe')
+    ]
+    for p in paths:
+        if os.path.exists(p):
+            return p
+    return None
+
+
+def find_tesseract():
+    """Tesseract path, probing the filesystem only when config.json has no still-valid cached one."""
+    if hasattr(sys, '_MEIPASS'): return get_tesseract_cmd()  # bundled copy moves every run
+    cached = config.get("tesseract_cmd")
+    if cached and os.path.exists(cached): return cached
+    cmd = get_tesseract_cmd()
+    if cmd: config.update(tesseract_cmd=cmd)
+    return cmd
+
+
+def _tessdata_dir():
+    cmd = pytesseract.pytesseract.tesseract_cmd
+    d = os.path.join(os.path.dirname(cmd), "tessdata") if cmd and os.path.dirname(cmd) else ""
+    return d if os.path.isdir(d) else None
+
+
+def _config(psm, whitelist):
+    return f"--psm {psm}" + (f" -c tessedit_char_whitelist={whitelist}" if whitelist else "")
+
+
+class CliBackend:
+    name = "cli"
+
+    def __init__(self, threads=None):
+        self.pool = ThreadPoolExecutor(max_workers=threads or os.cpu_count() or 2, thread_name_prefix="ocr")
+
+    def text(self, img, psm=6, whitelist=None):
+        return pytesseract.image_to_string(img, config=_config(psm, whitelist))
+
+    def text_many(self, imgs, psm=6, whitelist=None):
+        # tesseract runs out of process, so threads give real concurrency here
+        return list(self.pool.map(lambda im: self.text(im, psm, whitelist), imgs))
+
+    def words(self, img, psm=6):
+        """Recognised words as dicts: text, conf (0-100), box (x0, y0, x1, y1), line id."""
+        d = pytesseract.image_to_data(img, config=_config(psm, None), output_type=pytesseract.Output.DICT)
+        out = []
+        for i, t in enumerate(d["text"]):
+            if not t.strip(): continue
+            x, y = d["left"][i], d["top"][i]
+            out.append({"text": t, "conf": float(d["conf"][i]),
+                        "box": (x, y, x + d["width"][i], y + d["height"][i]),
+                        "line": (d["block_num"][i], d["par_num"][i], d["line_num"][i])})
+        return out
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+class ListBackend(CliBackend):
+    """Feeds every image to a single tesseract run through a list file, so the
+    language model is loaded once per call instead of once per image."""
+    name = "list"
+
+    def text_many(self, imgs, psm=6, whitelist=None):
+        if len(imgs) == 1: return [self.text(imgs[0], psm, whitelist)]
+        with tempfile.TemporaryDirectory(prefix="vortex_ocr_") as d:
+            paths = []
+            for i, im in enumerate(imgs):
+                p = os.path.join(d, f"{i}.png")
+                cv2.imwrite(p, im)
+                paths.append(p)
+            lst = os.path.join(d, "list.txt")
+            with open(lst, "w") as f: f.write("\n".join(paths) + "\n")
+            out = subprocess.run([pytesseract.pytesseract.tesseract_cmd, lst, "stdout", *_config(psm, whitelist).split()],
+                                 capture_output=True, check=True,
+                                 creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        pages = out.stdout.decode("utf-8", "replace").split("\f")
+        if len(pages) < len(imgs): raise RuntimeError("tesseract returned fewer pages than images")
+        return pages[:len(imgs)]
+
+
+class TesserocrBackend:
+    name = "tesserocr"
+
+    def __init__(self, threads=2):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.apis = queue.LifoQueue()
+        for _ in range(threads):
+            self.apis.put(tesserocr.PyTessBaseAPI(path=_tessdata_dir() or tesserocr.get_languages()[0]))
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="ocr")
+
+    def _set(self, api, img, psm, whitelist):
+        from PIL import Image
+        api.SetPageSegMode(psm)
+        api.SetVariable("tessedit_char_whitelist", whitelist or "")
+        api.SetImage(Image.fromarray(img) if isinstance(img, np.ndarray) else img)
+
+    def text(self, img, psm=6, whitelist=None):
+        api = self.apis.get()
+        try:
+            self._set(api, img, psm, whitelist)
+            return api.GetUTF8Text()
+        finally:
+            self.apis.put(api)
+
+    def text_many(self, imgs, psm=6, whitelist=None):
+        # tesserocr drops the GIL while recognising
+        return list(self.pool.map(lambda im: self.text(im, psm, whitelist), imgs))
+
+    def words(self, img, psm=6):
+        RIL = self._tesserocr.RIL
+        api = self.apis.get()
+        try:
+            self._set(api, img, psm, None)
+            api.Recognize()
+            out, line = [], -1
+            for r in self._tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+                if r.IsAtBeginningOf(RIL.TEXTLINE): line += 1
+                t = r.GetUTF8Text(RIL.WORD)
+                if not t or not t.strip(): continue
+                out.append({"text": t, "conf": r.Confidence(RIL.WORD), "box": r.BoundingBox(RIL.WORD), "line": line})
+            return out
+        finally:
+            self.apis.put(api)
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+        while not self.apis.empty(): self.apis.get().End()
+
+
+BACKENDS = {b.name: b for b in (TesserocrBackend, ListBackend, CliBackend)}
+
+
+def sample_image():
+    """Small panel-like image used to benchmark backends."""
+    img = np.zeros((120, 420), np.uint8)
+    for i, line in enumerate(["TEMP 84", "DEW POINT 71", "SRH 312", "PWAT 1.6"]):
+        cv2.putText(img, line, (8, 26 + i * 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+    return 255 - img
+
+
+def benchmark(names=None, rounds=2):
+    """Time each available backend on a pair of sample images. Returns {name: seconds}, failures omitted."""
+    img = sample_image()
+    res = {}
+    for n in names or BACKENDS:
+        try:
+            b = BACKENDS[n]()
+            b.text_many([img, img])  # warm-up, model load
+            t0 = time.perf_counter()
+            for _ in range(rounds): b.text_many([img, img])
+            res[n] = (time.perf_counter() - t0) / rounds
+            b.close()
+        except Exception:
+            continue
+    return res
+
+
+_backend = None
+_lock = threading.Lock()
+
+
+def install_key(cmd):
+    """Stable id of a tesseract install for the cached benchmark. The one-file exe unpacks
+    to a fresh temp dir every launch, so its copy is keyed by bundle path and exe size."""
+    if cmd and hasattr(sys, "_MEIPASS"):
+        try: size = os.path.getsize(sys.executable)
+        except OSError: size = 0
+        return f"bundle:{os.path.relpath(cmd, sys._MEIPASS)}@{size}"
+    return cmd
+
+
+def get_backend():
+    """Session-wide backend. The first call locates tesseract and picks the engine:
+    VORTEX_OCR_BACKEND if set, else the benchmark winner cached in config.json for
+    this tesseract install, else a fresh benchmark."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            cmd = find_tesseract()
+            # fall back to whatever is on PATH when no bundled/installed copy is found
+            pytesseract.pytesseract.tesseract_cmd = cmd or "tesseract"
+            name = os.getenv("VORTEX_OCR_BACKEND")
+            cached = config.get("ocr_backend") or {}
+            key = install_key(cmd)
+            if name not in BACKENDS and cached.get("tesseract_cmd") == key and cached.get("name") in BACKENDS:
+                name = cached["name"]
+            if name not in BACKENDS:
+                timings = benchmark()
+                name = min(timings, key=timings.get) if timings else "cli"
+                if timings: config.update(ocr_backend={"name": name, "tesseract_cmd": key})
+            try:
+                _backend = BACKENDS[name]()
+            except Exception:
+                _backend = CliBackend()
+        return _backend
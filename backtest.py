@@ -0,0 +1,225 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Backtest the scoring model on labeled cases and fit its thresholds.
+
+    python backtest.py cases.csv                          # skill of the active parameters
+    python backtest.py cases.csv --params params.json     # ... of a parameter file
+    python backtest.py cases.csv --fit -o params.json     # search, write a new parameter file
+    python backtest.py cases.csv --fit --only ef_cuts,mv_srh -n 5000 -j 8
+
+The case table is CSV (or JSONL) with the engine input columns (temp, dew,
+cape, ...) plus the observed `shape` (Wedge, Rope, ...) and/or `ef` (EF3 or
+3). Either label may be blank. Every parameter set is scored over the whole
+table in one vectorized engine.score() call; candidates are spread over a
+process pool. The search is random sampling around the starting point
+followed by a few shrinking refinement rounds around the best set so far.
+The result goes to a versioned parameter file engine.load_params() reads.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import engine
+
+
+def load_cases(path):
+    """-> {"cols": field -> array, "shape": int array (-1 = unlabeled), "ef": int array, "ids", "sha"}."""
+    with open(path, "rb") as f: sha = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".json")): rows = [json.loads(l) for l in f if l.strip()]
+        else: rows = list(csv.DictReader(f))
+
+    def num(x):
+        try: return float(str(x).replace(",", "."))
+        except ValueError: return 0.0
+
+    def ef(x):
+        x = str(x or "").strip().upper().lstrip("EF")
+        return int(x) if x.isdigit() and int(x) < len(engine.EF_LABELS) else -1
+
+    lower = {s.lower(): i for i, s in enumerate(engine.SHAPES)}
+    return {
+        "cols": {k: np.array([num(r.get(k) or 0) for r in rows]) for k in engine.FIELDS},
+        "shape": np.array([lower.get(str(r.get("shape") or "").strip().lower(), -1) for r in rows]),
+        "ef": np.array([ef(r.get("ef")) for r in rows]),
+        "ids": [str(r.get("id", i)) for i, r in enumerate(rows)],
+        "sha": sha,
+    }
+
+
+def evaluate(cases, params=None):
+    """Skill of one parameter set on the case table."""
+    r = engine.score(cases["cols"], params)
+    m = {"n": len(cases["ids"])}
+
+    ok = cases["ef"] >= 0
+    if ok.any():
+        pred, obs = r["ef"][ok], cases["ef"][ok]
+        k = len(engine.EF_LABELS)
+        acc = float(np.mean(pred == obs))
+        expect = float(np.dot(np.bincount(pred, minlength=k), np.bincount(obs, minlength=k))) / len(obs) ** 2
+        m.update(ef_n=int(ok.sum()), ef_acc=acc, ef_within1=float(np.mean(np.abs(pred - obs) <= 1)),
+                 ef_mae=float(np.mean(np.abs(pred - obs))), ef_bias=float(np.mean(pred - obs)),
+                 ef_hss=(acc - expect) / (1 - expect) if expect < 1 else 0.0)
+
+    ok = cases["shape"] >= 0
+    if ok.any():
+        pct = np.stack([r["shapes"][s] for s in engine.SHAPES])[:, ok] / 100
+        obs = cases["shape"][ok]
+        p_obs = pct[obs, np.arange(len(obs))]
+        m.update(shape_n=int(ok.sum()), shape_acc=float(np.mean(pct.argmax(0) == obs)),
+                 shape_p=float(p_obs.mean()), shape_logloss=float(-np.log(np.maximum(p_obs, 1e-6)).mean()))
+    return m
+
+
+def loss(m, shape_weight=1.0):
+    """Lower is better: mean EF class error plus weighted shape log loss."""
+    return m.get("ef_mae", 0.0) + shape_weight * m.get("shape_logloss", 0.0)
+
+
+# ---- flat vector view of a params dict, for the search ----
+
+def names_of(params, only=None):
+    out = []
+    for k, val in params.items():
+        if only and not any(k == o or k.startswith(o) for o in only): continue
+        if isinstance(val, dict): out += [(k, sk) for sk in val]
+        elif isinstance(val, tuple): out += [(k, i) for i in range(len(val))]
+        else: out.append((k, None))
+    return out
+
+
+def flatten(params, names):
+    return np.array([params[k][i] if i is not None else params[k] for k, i in names], dtype=float)
+
+
+def unflatten(vec, names, template):
+    p = {k: (dict(v) if isinstance(v, dict) else list(v) if isinstance(v, tuple) else v) for k, v in template.items()}
+    for x, (k, i) in zip(vec, names):
+        if i is None: p[k] = float(x)
+        else: p[k][i] = float(x)
+    for k, v in p.items():
+        if not isinstance(v, list): continue
+        if k == "ef_cuts": v.sort()
+        elif v[1] <= v[0]: v[1] = v[0] + 1e-3  # keep ramps well defined
+        p[k] = tuple(v)
+    return p
+
+
+def scales(params, names, spread):
+    """Search step per coordinate: relative to the value, or to the ramp width for ramp ends at 0."""
+    out = []
+    for k, i in names:
+        v = params[k]
+        x = v[i] if i is not None else v
+        if isinstance(v, tuple) and k != "ef_cuts" and i < 2: x = max(abs(x), abs(v[1] - v[0]))
+        out.append(spread * (abs(x) or 1.0))
+    return np.array(out)
+
+
+_W = {}
+
+
+def _init_worker(cases, names, template, shape_weight):
+    _W.update(cases=cases, names=names, template=template, shape_weight=shape_weight)
+
+
+def _eval_chunk(vecs):
+    return [loss(evaluate(_W["cases"], unflatten(v, _W["names"], _W["template"])), _W["shape_weight"]) for v in vecs]
+
+
+def search(cases, start=None, only=None, n=2000, rounds=4, spread=0.5, workers=None,
+           shape_weight=1.0, seed=0, log=sys.stderr):
+    """Random search plus shrinking refinement. Returns (best params, best loss, evaluated count)."""
+    start = start or engine.active_params()
+    names = names_of(start, only)
+    x0 = flatten(start, names)
+    step = scales(start, names, spread)
+    rng = np.random.default_rng(seed)
+    best_x, best = x0, loss(evaluate(cases, start), shape_weight)
+    if log: print(f"start loss {best:.4f}, {len(names)} parameters", file=log)
+    workers = workers or os.cpu_count() or 1
+    per_round = [n // 2] + [max(1, n // (2 * rounds))] * rounds
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cases, names, start, shape_weight)) as pool:
+        for r, count in enumerate(per_round):
+            cand = best_x + rng.uniform(-1, 1, (count, len(names))) * step
+            chunks = [cand[i:i + 64] for i in range(0, count, 64)]
+            losses = np.concatenate([np.asarray(c) for c in pool.map(_eval_chunk, chunks)])
+            done += count
+            i = int(losses.argmin())
+            if losses[i] < best: best, best_x = float(losses[i]), cand[i]
+            if log: print(f"round {r}: {count} sets, best loss {best:.4f}", file=log)
+            step = step * 0.5
+    return unflatten(best_x, names, start), best, done
+
+
+def write_params(path, params, metrics, cases, note=""):
+    """Write a parameter file; its version is one past the file it replaces."""
+    version = 0
+    try:
+        with open(path, "r", encoding="utf-8") as f: version = int(json.load(f).get("version", 0))
+    except (OSError, ValueError): pass
+    rec = {
+        "format": engine.PARAMS_FORMAT,
+        "version": version + 1,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": {"n": len(cases["ids"]), "sha": cases["sha"]},
+        "metrics": metrics,
+        "note": note,
+        "params": {k: (list(v) if isinstance(v, tuple) else v) for k, v in params.items()},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(rec, f, indent=1)
+    os.replace(tmp, path)
+    return rec["version"]
+
+
+def _show(m):
+    return "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in m.items())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="backtest", description="Backtest and calibrate the scoring model.")
+    ap.add_argument("cases", help="labeled case table (CSV or JSONL)")
+    ap.add_argument("--params", help="parameter file to evaluate / start from (default: active)")
+    ap.add_argument("--fit", action="store_true", help="search for better thresholds")
+    ap.add_argument("-o", "--out", default="params.json", help="parameter file to write with --fit")
+    ap.add_argument("--only", help="comma-separated parameter names (or prefixes) to fit")
+    ap.add_argument("-n", "--samples", type=int, default=2000, help="parameter sets to evaluate")
+    ap.add_argument("--rounds", type=int, default=4, help="refinement rounds")
+    ap.add_argument("--spread", type=float, default=0.5, help="initial search radius, relative")
+    ap.add_argument("--shape-weight", type=float, default=1.0, help="weight of shape log loss vs EF error")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    cases = load_cases(args.cases)
+    start = engine.load_params(args.params) if args.params else engine.active_params()
+    m = evaluate(cases, start)
+    print("current:", _show(m))
+    if not args.fit: return
+    t0 = time.perf_counter()
+    best, _, done = search(cases, start, args.only.split(",") if args.only else None, args.samples,
+                           args.rounds, args.spread, args.workers, args.shape_weight, args.seed)
+    fitted = evaluate(cases, best)
+    print(f"fitted:  {_show(fitted)}  ({done} sets in {time.perf_counter() - t0:.1f}s)")
+    v = write_params(args.out, best, fitted, cases, note=f"fit {args.only or 'all'} from {args.params or 'active'}")
+    print(f"wrote {args.out} (version {v})")
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
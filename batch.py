@@ -0,0 +1,152 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Batch OCR over a directory (or manifest) of thermodynamics/composite pairs.
+
+    python batch.py SCREENSHOTS_DIR -o results.jsonl
+    python batch.py manifest.jsonl -o results.jsonl -j 8
+
+A directory is walked recursively and files are paired by name:
+`<id>_thermo.png` goes with `<id>_comp.png` (`thermodynamics`/`composite(s)`
+also work). A manifest is JSONL with one `{"id", "thermo", "comp"}` per line,
+paths relative to the manifest.
+
+One JSON record is appended to the output per pair as soon as it finishes.
+The output doubles as the checkpoint: rerunning skips ids already in it
+(pairs that errored are retried).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+IMAGE_EXT = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp")
+PAIR_RE = re.compile(r"^(?P<id>.+?)[_\-. ](?P<kind>thermo(?:dynamics)?|comp(?:osites?)?)$", re.IGNORECASE)
+
+
+def pairs_from_dir(root):
+    """Yield (id, thermo_path, comp_path) one directory at a time."""
+    for d, dirs, files in os.walk(root):
+        dirs.sort()
+        found = {}
+        for f in sorted(files):
+            stem, ext = os.path.splitext(f)
+            m = PAIR_RE.match(stem)
+            if ext.lower() not in IMAGE_EXT or not m: continue
+            kind = "thermo" if m.group("kind").lower().startswith("thermo") else "comp"
+            found.setdefault(m.group("id"), {})[kind] = os.path.join(d, f)
+        rel = os.path.relpath(d, root)
+        for pid, p in found.items():
+            if "thermo" in p and "comp" in p:
+                yield (pid if rel == "." else f"{rel}/{pid}".replace(os.sep, "/")), p["thermo"], p["comp"]
+
+
+def pairs_from_manifest(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            rec = json.loads(line)
+            yield str(rec["id"]), os.path.join(base, rec["thermo"]), os.path.join(base, rec["comp"])
+
+
+def done_ids(out_path):
+    """Ids already written to out_path. A half-written last line (crash mid-write) is cut off."""
+    if not os.path.exists(out_path): return set()
+    with open(out_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.splitlines():
+        try:
+            rec = json.loads(line)
+            if "error" not in rec: done.add(rec["id"])
+        except (ValueError, KeyError): pass
+    return done
+
+
+def _init_worker(backend, use_layout):
+    # one tesseract thread per process, the pool already fills the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    os.environ["VORTEX_OCR_BACKEND"] = backend
+    if use_layout: os.environ["VORTEX_LAYOUT"] = "1"
+
+
+def _work(job):
+    from PIL import Image
+    import ocr
+    pid, thermo, comp = job
+    t0 = time.perf_counter()
+    rec = {"id": pid, "thermo": thermo, "comp": comp}
+    try:
+        with Image.open(thermo) as t, Image.open(comp) as c:
+            rec["data"] = ocr.read_pair(t.convert("RGB"), c.convert("RGB"))
+    except Exception as e:
+        rec["error"] = f"{type(e).__name__}: {e}"
+    rec["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return rec
+
+
+def run(jobs, out_path, workers=None, resume=True, use_layout=False, log=sys.stderr):
+    """Run jobs through a process pool, streaming records to out_path. Returns count written.
+
+    At most 2x workers pairs are in flight, so memory stays flat however long `jobs` is.
+    """
+    workers = workers or os.cpu_count() or 1
+    # benchmark once here instead of in every worker
+    import backends
+    backend = backends.get_backend().name
+    done = done_ids(out_path) if resume else set()
+    written = 0
+
+    def emit(finished):
+        nonlocal written
+        for fut in finished:
+            rec = fut.result()
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+            written += 1
+            if log: print(f"[{written}] {rec['id']} {'ERROR ' + rec['error'] if 'error' in rec else 'ok'} ({rec['ms']} ms)", file=log)
+
+    with open(out_path, "a" if resume else "w", encoding="utf-8") as out, \
+         ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend, use_layout)) as pool:
+        pending = set()
+        for job in jobs:
+            if job[0] in done: continue
+            pending.add(pool.submit(_work, job))
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                emit(finished)
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            emit(finished)
+    return written
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="batch", description="Batch OCR of thermodynamics/composite screenshot pairs.")
+    ap.add_argument("source", help="directory of screenshots or a JSONL manifest")
+    ap.add_argument("-o", "--out", default="results.jsonl", help="JSONL output, also the resume checkpoint")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--layout", action="store_true", help="learn the thermo panel layout once, then OCR only its value cells")
+    ap.add_argument("--restart", action="store_true", help="ignore and overwrite existing output")
+    args = ap.parse_args(argv)
+
+    jobs = pairs_from_dir(args.source) if os.path.isdir(args.source) else pairs_from_manifest(args.source)
+    t0 = time.perf_counter()
+    n = run(jobs, args.out, workers=args.workers, resume=not args.restart, use_layout=args.layout)
+    print(f"{n} pairs in {time.perf_counter() - t0:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
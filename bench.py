@@ -0,0 +1,161 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Per-stage performance benchmark on synthetic panels.
+
+    python bench.py                 # run and compare with bench_baseline.json
+    python bench.py --save          # run and write a new baseline
+    python bench.py -n 100 --json   # more pairs, machine-readable output
+
+Stages, in the order the overlay runs them:
+- capture:    capture backend grab of a panel-sized region (skipped without a display);
+              SnippingTool also waits for the overlay to unmap (polled, ~30-50 ms)
+- preprocess: ocr.preprocess() on every panel
+- ocr:        the tesseract calls run_ocr() makes, one pair at a time (skipped without tesseract)
+- parse:      ocr.parse_data() on the OCR text (or on the clean panel text without tesseract)
+- calc:       engine.score_one() on the parsed values
+
+Each stage reports throughput, p50/p90/p99 latency and peak traced memory
+(a separate tracemalloc pass, so timings are not skewed by it). Accuracy is
+the share of fields parse_data() got right against the generator's truth.
+The run fails if a p50 is more than 25% over the baseline or accuracy drops
+by more than a point.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("VORTEX_NO_CACHE", "1")  # measure real work, not cache hits
+
+import numpy as np
+
+import synth
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+TOLERANCE = 1.25
+ACCURACY_DROP = 0.01
+
+
+def _stats(ms, peak):
+    ms = np.asarray(ms)
+    return {"n": len(ms), "per_s": round(1000 * len(ms) / ms.sum(), 1) if ms.sum() else 0.0,
+            "p50_ms": round(float(np.percentile(ms, 50)), 3), "p90_ms": round(float(np.percentile(ms, 90)), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def stage(fn, items, mem_items=5):
+    """Time fn over items, then trace peak memory over the first few. -> (stats, outputs)."""
+    out, ms = [], []
+    for it in items:
+        t0 = time.perf_counter()
+        out.append(fn(it))
+        ms.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    for it in items[:mem_items]:
+        tracemalloc.reset_peak()
+        fn(it)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _stats(ms, peak), out
+
+
+def correct(parsed, truth):
+    ok = 0
+    for k, v in truth.items():
+        try: ok += abs(float(parsed.get(k) or "nan") - float(v)) < 1e-6
+        except ValueError: pass
+    return ok
+
+
+def run(n=40, seed=0, log=sys.stderr):
+    import engine, ocr
+    fonts = synth.available_fonts()
+    pairs = [synth.make_pair(seed * 1_000_003 + i, fonts) for i in range(n)]
+    truths = [p[2] for p in pairs]
+    res = {"env": {"pairs": n, "seed": seed, "fonts": fonts, "cpus": os.cpu_count()}}
+
+    try:
+        import capture
+        backend = capture.get_backend()
+        backend.grab((0, 0, 8, 8))
+        w, h = pairs[0][0].size
+        res["capture"], _ = stage(lambda _: backend.grab((0, 0, w, h)), list(range(n)))
+        res["env"]["capture"] = backend.name
+    except Exception as e:
+        if log: print(f"capture skipped: {e}", file=log)
+
+    panels = [im for t, c, _, _ in pairs for im in (t, c)]
+    res["preprocess"], pre = stage(ocr.preprocess, panels)
+    pre_pairs = [pre[i:i + 2] for i in range(0, len(pre), 2)]
+
+    texts = None
+    try:
+        import backends
+        b = backends.get_backend()
+        b.text_many(pre_pairs[0], ocr.PSM)
+        res["ocr"], out = stage(lambda p: b.text_many(p, ocr.PSM), pre_pairs, mem_items=2)
+        res["env"]["backend"] = b.name
+        texts = [t + "\n" + c for t, c in out]
+    except Exception as e:
+        if log: print(f"ocr skipped, parsing clean panel text instead: {e}", file=log)
+    if texts is None: texts = [synth.text_of(t) for t in truths]
+    res["env"]["parse_input"] = "ocr" if "ocr" in res else "clean"
+
+    res["parse"], parsed = stage(ocr.parse_data, texts)
+    fields = sum(len(t) for t in truths)
+    res["accuracy"] = round(sum(correct(p, t) for p, t in zip(parsed, truths)) / fields, 4)
+
+    vals = [dict(engine.to_values({k: p.get(k, "") for k in engine.FIELDS}), speed=60.0) for p in parsed]
+    res["calc"], _ = stage(engine.score_one, vals)
+    return res
+
+
+def compare(res, base):
+    """-> list of regression messages."""
+    bad = []
+    for k, s in res.items():
+        if not isinstance(s, dict) or "p50_ms" not in s or k not in base: continue
+        if s["p50_ms"] > base[k]["p50_ms"] * TOLERANCE:
+            bad.append(f"{k}: p50 {s['p50_ms']:.2f} ms vs baseline {base[k]['p50_ms']:.2f} ms")
+    if "accuracy" in base and base.get("env", {}).get("parse_input") == res["env"]["parse_input"] \
+            and res["accuracy"] < base["accuracy"] - ACCURACY_DROP:
+        bad.append(f"accuracy {res['accuracy']:.1%} vs baseline {base['accuracy']:.1%}")
+    return bad
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench", description="Per-stage benchmark on synthetic panels.")
+    ap.add_argument("-n", "--pairs", type=int, default=40)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save", action="store_true", help="write the result as the new baseline")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = ap.parse_args(argv)
+
+    res = run(args.pairs, args.seed)
+    if args.json: print(json.dumps(res, indent=1))
+    else:
+        for k, s in res.items():
+            if isinstance(s, dict) and "p50_ms" in s:
+                print(f"{k:>10}: {s['per_s']:>9.1f}/s  p50 {s['p50_ms']:8.2f}  p90 {s['p90_ms']:8.2f}"
+                      f"  p99 {s['p99_ms']:8.2f} ms  peak {s['peak_kb']:9.1f} KB")
+        print(f"  accuracy: {res['accuracy']:.1%} ({res['env']['parse_input']} text)")
+    if args.save:
+        with open(args.baseline, "w") as f: json.dump(res, f, indent=1)
+        print(f"baseline written to {args.baseline}")
+        return
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f: bad = compare(res, json.load(f))
+        for b in bad: print(f"FAIL: {b}")
+        sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Startup regression check for Vortex.py.
+
+    python bench_startup.py            # measure and compare with startup_baseline.json
+    python bench_startup.py --save     # measure and write a new baseline
+
+Measures, over a few fresh interpreters:
+- import: wall time of `import Vortex`
+- first frame: process launch until the landing window has painted (VORTEX_STARTUP_PROBE)
+and fails if heavy modules (cv2, numpy, pytesseract, requests) get imported
+eagerly again, or if a median is more than 25% over the baseline.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "startup_baseline.json")
+# PIL is left out: customtkinter itself imports it
+HEAVY = ("cv2", "numpy", "pytesseract", "requests", "tesserocr")
+TOLERANCE = 1.25
+
+
+def _py(code, env=None):
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, env=env, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def import_time():
+    return float(_py("import time; t = time.perf_counter(); import Vortex; print(time.perf_counter() - t)"))
+
+
+def eager_heavy():
+    code = f"import sys, json, Vortex; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    return json.loads(_py(code))
+
+
+def first_frame():
+    env = dict(os.environ, VORTEX_STARTUP_PROBE="1")
+    t0 = time.time()
+    out = subprocess.run([sys.executable, os.path.join(HERE, "Vortex.py")], cwd=HERE, capture_output=True,
+                         text=True, env=env, timeout=60, check=True)
+    rec = json.loads([l for l in out.stdout.splitlines() if l.startswith("{")][-1])
+    return rec["first_frame"] - t0
+
+
+def measure(runs=5):
+    imp = [import_time() for _ in range(runs)]
+    ttff = []
+    try:
+        ttff = [first_frame() for _ in range(runs)]
+    except (subprocess.SubprocessError, ValueError, IndexError) as e:
+        print(f"first frame not measured (no display?): {e}", file=sys.stderr)
+    res = {"import_s": statistics.median(imp)}
+    if ttff: res["first_frame_s"] = statistics.median(ttff)
+    return res
+
+
+def main():
+    heavy = eager_heavy()
+    res = measure()
+    for k, v in res.items(): print(f"{k:>14}: {v * 1000:8.1f} ms")
+    if "--save" in sys.argv:
+        with open(BASELINE, "w") as f: json.dump(res, f, indent=1)
+        print(f"baseline written to {BASELINE}")
+    failed = False
+    if heavy:
+        print(f"FAIL: imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if os.path.exists(BASELINE) and "--save" not in sys.argv:
+        with open(BASELINE) as f: base = json.load(f)
+        for k, v in res.items():
+            if k in base and v > base[k] * TOLERANCE:
+                print(f"FAIL: {k} {v * 1000:.1f} ms vs baseline {base[k] * 1000:.1f} ms")
+                failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Content-addressed OCR cache.
+
+Keys are hashes of the thresholded image preprocess() hands to tesseract, so a
+re-snipped identical panel hits even though the PIL image object is new.
+Entries live in an in-memory LRU in front of a directory of small JSON files
+that is trimmed (oldest first) when it grows past its size budget. Every entry
+records the OCR version string it was made with; a mismatch counts as a miss.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+
+
+def image_key(img):
+    a = np.ascontiguousarray(img)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{a.dtype}{a.shape}".encode())
+    h.update(a.data)
+    return h.hexdigest()
+
+
+def combine_keys(*keys):
+    return hashlib.blake2b("|".join(keys).encode(), digest_size=16).hexdigest()
+
+
+def default_dir():
+    return os.getenv("VORTEX_CACHE_DIR") or config.data_dir("ocr_cache")
+
+
+class OcrCache:
+    def __init__(self, path=None, version="", mem_items=256, max_bytes=64 * 1024 * 1024):
+        self.path = path or default_dir()
+        self.version = version
+        self.mem_items = mem_items
+        self.max_bytes = max_bytes
+        self.mem = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._disk_bytes = None
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + ".json")
+
+    def get(self, key):
+        with self.lock:
+            if key in self.mem:
+                self.mem.move_to_end(key)
+                self.hits += 1
+                return self.mem[key]
+        val = self._load(key)
+        with self.lock:
+            if val is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, val)
+        return val
+
+    def put(self, key, val):
+        with self.lock: self._remember(key, val)
+        try: self._store(key, val)
+        except OSError: pass  # cache is best effort, never fail an OCR run over it
+
+    def _remember(self, key, val):
+        self.mem[key] = val
+        self.mem.move_to_end(key)
+        while len(self.mem) > self.mem_items: self.mem.popitem(last=False)
+
+    def _load(self, key):
+        p = self._file(key)
+        try:
+            with open(p, "r", encoding="utf-8") as f: rec = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if rec.get("v") != self.version:
+            try: os.remove(p)
+            except OSError: pass
+            return None
+        try: os.utime(p)  # mtime doubles as last-used for eviction
+        except OSError: pass
+        return rec["val"]
+
+    def _store(self, key, val):
+        p = self._file(key)
+        os.makedirs(os.path.dirname(p), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(p), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f: json.dump({"v": self.version, "val": val}, f)
+        os.replace(tmp, p)  # atomic, batch workers share the directory
+        size = os.path.getsize(p)
+        if self._disk_bytes is None: self._disk_bytes = self._scan()[1]
+        else: self._disk_bytes += size
+        if self._disk_bytes > self.max_bytes: self._evict()
+
+    def _scan(self):
+        files, total = [], 0
+        for d, _, names in os.walk(self.path):
+            for n in names:
+                if not n.endswith(".json"): continue
+                p = os.path.join(d, n)
+                try: st = os.stat(p)
+                except OSError: continue
+                files.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        return files, total
+
+    def _evict(self):
+        # trim to 80% so we don't rescan on every following put
+        files, total = self._scan()
+        files.sort()
+        for _, size, p in files:
+            if total <= self.max_bytes * 0.8: break
+            try: os.remove(p)
+            except OSError: continue
+            total -= size
+        self._disk_bytes = total
+
+    def clear(self):
+        with self.lock: self.mem.clear()
+        for _, _, p in self._scan()[0]:
+            try: os.remove(p)
+            except OSError: pass
+        self._disk_bytes = 0
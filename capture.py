@@ -0,0 +1,220 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Screen capture backends and frame sources.
+
+A backend has grab(bbox) -> Frame, a NumPy array (H, W, 3 or 4) that
+preprocessing takes as is. Frame.channels says the byte order, so a BGRA
+shared-memory grab goes straight to grayscale without being reordered first.
+
+- mss:       native grab (XShm on X11, BitBlt on Windows, CoreGraphics on macOS), if mss is installed
+- imagegrab: PIL ImageGrab, the original path
+- replay:    image files from disk, for tests and demos
+
+Set VORTEX_CAPTURE (or "capture" in config.json) to force one by name.
+
+Watch mode uses sources: grab(rects) -> {name: Frame}, or None once a
+source runs dry. ScreenSource grabs the live screen through the backend;
+ReplaySource plays back recorded pairs (<id>_thermo / <id>_comp, as in
+batch mode).
+"""
+
+import os
+import threading
+
+import numpy as np
+
+import config
+import tracing
+
+
+class Frame(np.ndarray):
+    """Captured pixels; a view, never a copy, of what the backend returned."""
+    channels = "RGB"
+
+    @classmethod
+    def wrap(cls, a, channels=None):
+        f = np.asarray(a).view(cls)
+        f.channels = channels or ("RGBA" if f.ndim == 3 and f.shape[2] == 4 else "RGB")
+        return f
+
+    def __array_finalize__(self, obj):
+        self.channels = getattr(obj, "channels", "RGB")
+
+
+def to_pil(img):
+    """PIL image from a Frame (or anything else preprocess accepts), for saving/uploading."""
+    from PIL import Image
+    if not isinstance(img, np.ndarray): return img
+    a = np.asarray(img)
+    ch = getattr(img, "channels", "RGB")
+    if ch.startswith("BGR"): a = a[..., [2, 1, 0]]
+    elif a.ndim == 3 and a.shape[2] == 4: a = a[..., :3]
+    return Image.fromarray(np.ascontiguousarray(a))
+
+
+class ImageGrabBackend:
+    name = "imagegrab"
+
+    def grab(self, bbox):
+        from PIL import ImageGrab
+        return Frame.wrap(np.asarray(ImageGrab.grab(bbox)))
+
+
+class MssBackend:
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss = mss
+        self.local = threading.local()  # an mss handle must stay on the thread that opened it
+
+    def grab(self, bbox):
+        sct = getattr(self.local, "sct", None)
+        if sct is None: sct = self.local.sct = self._mss.mss()
+        x1, y1, x2, y2 = bbox
+        shot = sct.grab({"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1})
+        a = np.frombuffer(shot.bgra, np.uint8).reshape(shot.height, shot.width, 4)
+        return Frame.wrap(a, "BGRA")
+
+
+class ReplayBackend:
+    name = "replay"
+
+    def __init__(self, paths=None, loop=True):
+        """paths: image files, or a directory of them (sorted). Each grab returns the next one."""
+        paths = paths or os.getenv("VORTEX_CAPTURE_REPLAY", "")
+        if isinstance(paths, str):
+            d = paths
+            paths = sorted(os.path.join(d, f) for f in os.listdir(d)) if os.path.isdir(d) else [d]
+        self.paths = [p for p in paths if os.path.splitext(p)[1].lower() in (".png", ".jpg", ".jpeg", ".bmp", ".webp")]
+        self.loop = loop
+        self.pos = 0
+        self.lock = threading.Lock()
+
+    def grab(self, bbox=None):
+        from PIL import Image
+        with self.lock:
+            if self.pos >= len(self.paths):
+                if not self.loop or not self.paths: raise EOFError("replay exhausted")
+                self.pos = 0
+            p = self.paths[self.pos]
+            self.pos += 1
+        with Image.open(p) as im: return Frame.wrap(np.asarray(im.convert("RGB")))
+
+
+BACKENDS = {b.name: b for b in (MssBackend, ImageGrabBackend, ReplayBackend)}
+
+_backend = None
+_lock = threading.Lock()
+
+
+def get_backend():
+    """Session-wide capture backend: the forced one, else mss when available, else ImageGrab."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            name = os.getenv("VORTEX_CAPTURE") or config.get("capture")
+            for n in ([name] if name in BACKENDS else []) + ["mss", "imagegrab"]:
+                try:
+                    _backend = BACKENDS[n]()
+                    break
+                except Exception:
+                    continue
+        return _backend
+
+
+def _unbind(w, seq, funcid):
+    # Misc.unbind(seq, funcid) drops every script on seq in older Pythons; remove only ours
+    try:
+        script = "\n".join(l for l in w.bind(seq).split("\n") if funcid not in l)
+        w.tk.call("bind", w._w, seq, script)
+        w.deletecommand(funcid)
+    except Exception:
+        pass
+
+
+def after_gone(root, fn, hide=(), destroy=(), settle_ms=150, timeout_ms=1000):
+    """Withdraw `hide`, destroy `destroy`, and call fn on the Tk thread once every one of them
+    has reported <Unmap>/<Destroy>, plus settle_ms for the compositor to drop its last frame
+    (fade-out animations run ~100-200 ms). Never blocks the event loop.
+
+    winfo_ismapped() can't be polled for this: Tk clears it inside withdraw() itself,
+    before the window manager has taken anything off screen."""
+    waiting, binds, state = set(), [], {"done": False}
+
+    def finish():
+        if state["done"]: return
+        state["done"] = True
+        for w, seq, fid in binds: _unbind(w, seq, fid)
+        root.after(settle_ms, fn)
+
+    def seen(w):
+        waiting.discard(w)
+        if not waiting: finish()
+
+    for w, seq in [(w, "<Unmap>") for w in hide] + [(w, "<Destroy>") for w in destroy]:
+        try:
+            if seq == "<Unmap>" and not w.winfo_ismapped(): continue  # already off screen
+        except Exception:
+            continue
+        waiting.add(w)
+        # bindings on a toplevel also fire for its children; only the toplevel's own event counts
+        fid = w.bind(seq, lambda e, w=w: seen(w) if e.widget is w else None, add="+")
+        if seq == "<Unmap>": binds.append((w, seq, fid))
+    for w in hide: w.withdraw()
+    for w in destroy: w.destroy()
+    if not waiting: finish()
+    else: root.after(timeout_ms, finish)  # a window manager that never says so
+
+
+def grab_async(root, bbox, callback, errback=None, hide=(), destroy=()):
+    """Hide/destroy the given windows, wait until they're off screen, grab on a worker thread,
+    then hand the Frame to callback on the Tk thread."""
+    def work():
+        try:
+            with tracing.span("capture.grab"): img = get_backend().grab(bbox)
+        except Exception as e:
+            if errback: root.after(0, lambda: errback(e))
+            return
+        root.after(0, lambda: callback(img))
+
+    def start():
+        unmap.end()
+        threading.Thread(target=work, name="capture", daemon=True).start()
+
+    unmap = tracing.begin("capture.unmap")
+    after_gone(root, start, hide, destroy)
+
+
+class ScreenSource:
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def grab(self, rects):
+        b = self.backend or get_backend()
+        return {name: b.grab(bbox) for name, bbox in rects.items()}
+
+
+class ReplaySource:
+    def __init__(self, path, loop=False, repeat=1):
+        """path: directory of pairs, or a batch manifest. Each pair is served `repeat` times in a row."""
+        import batch
+        pairs = batch.pairs_from_manifest(path) if os.path.isfile(path) else batch.pairs_from_dir(path)
+        self.frames = [{"thermo": t, "comp": c} for _, t, c in pairs]
+        self.loop = loop
+        self.repeat = max(1, repeat)
+        self.pos = 0
+
+    def grab(self, rects):
+        from PIL import Image
+        i = self.pos // self.repeat
+        if i >= len(self.frames):
+            if not self.loop or not self.frames: return None
+            self.pos, i = 0, 0
+        self.pos += 1
+        out = {}
+        for name in rects:
+            with Image.open(self.frames[i][name]) as im: out[name] = Frame.wrap(np.asarray(im.convert("RGB")))
+        return out
@@ -0,0 +1,58 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""config.json access. Keys are merged on save so unrelated settings survive."""
+
+import json
+import os
+import tempfile
+import threading
+
+
+CONFIG_FILE = "config.json"
+
+_lock = threading.Lock()
+
+
+def data_dir(*parts):
+    """Per-user Vortex data directory (caches, templates, spool), or a subpath of it."""
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Vortex", *parts)
+
+
+def _read():
+    if not os.path.exists(CONFIG_FILE): return {}
+    with open(CONFIG_FILE, "r") as f:
+        data = json.load(f)
+        return data if isinstance(data, dict) else {}
+
+
+def load():
+    try: return _read()
+    except: return {}
+
+
+def get(key, default=None):
+    return load().get(key, default)
+
+
+def update(**values):
+    with _lock:
+        try: data = _read()
+        except: return  # unreadable: don't replace it with just these keys
+        data.update(values)
+        tmp = None
+        try:
+            # other processes (batch/server workers) may read or write it at the same moment;
+            # they only ever see the old file or the new one, never a half-written one
+            fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(CONFIG_FILE)))
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, CONFIG_FILE)
+            tmp = None
+        except: pass
+        finally:
+            if tmp:
+                try: os.remove(tmp)
+                except OSError: pass
@@ -0,0 +1,236 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Headless scoring model. Same math as the overlay, but over whole columns at once.
+
+Every threshold lives in PARAMS: (min, max, points) for the sc() ramps, plain
+numbers for the rest. A fitted parameter file (see backtest.py) can replace
+them via VORTEX_PARAMS / the "params_file" config key or use_params().
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+
+FIELDS = ("temp", "dew", "cape", "3cape", "srh", "lapse", "rh", "mid_rh", "pwat", "stp", "vtp")
+SHAPES = ("Wedge", "Stovepipe", "Drillbit", "Sidewinder", "Cone", "Rope")
+BASE = {"Wedge": 10, "Stovepipe": 10, "Drillbit": 3, "Sidewinder": 5, "Cone": 10, "Rope": 10}
+EF_CUTS = (1.5, 3.0, 5.0, 8.0, 13.0)
+EF_LABELS = ("EF0", "EF1", "EF2", "EF3", "EF4", "EF5")
+PARAMS_FORMAT = 1
+
+DEFAULT_PARAMS = {
+    "base": BASE,
+    "constriction": (7.0, 10.0, 1.0),       # lapse
+    "drill_rh": (0.0, 25.0, 40.0),          # 45 - rh, only when rh < 45 ...
+    "drill_rh_max": 45.0,
+    "drill_lapse": (10.5, 12.5, 40.0),      # ... and lapse above the ramp start
+    "wedge_spread": (0.0, 10.0, 50.0),      # 15 - (temp - dew)
+    "wedge_spread_ref": 15.0,
+    "wedge_rh": (60.0, 100.0, 60.0),
+    "wedge_mid_rh": (60.0, 95.0, 30.0),
+    "wedge_big_cape": 5000.0,
+    "wedge_big_cape_bonus": 20.0,
+    "wedge_penalty": (8.5, 10.0, 15.0),     # lapse, waived for big CAPE
+    "wedge_floor": 5.0,
+    "stove_lapse_up": (6.5, 8.0, 30.0),
+    "stove_lapse_down": (9.2, 11.0, 30.0),
+    "stove_rh": (50.0, 85.0, 40.0),
+    "side_vtp": (1.0, 6.0, 50.0),
+    "side_constriction": 25.0,
+    "boost_stp": (5.0, 25.0, 40.0),
+    "boost_tight": 0.7,
+    "boost_drill": 0.8,
+    "boost_wedge": 0.9,
+    "boost_stove": 0.4,
+    "mv_base": 5.0,
+    "mv_max": 95.0,
+    "mv_srh": (200.0, 800.0, 80.0),
+    "mv_stp": (5.0, 25.0, 20.0),
+    "rain_base": 10.0,
+    "rain_max": 100.0,
+    "rain_pwat": (1.0, 2.5, 70.0),
+    "rain_rh": (60.0, 100.0, 20.0),
+    "pwr_div": 250000.0,
+    "pwr_stp": 0.7,
+    "pwr_constriction": 1.5,
+    "ef_cuts": EF_CUTS,
+}
+
+PARAMS = DEFAULT_PARAMS
+_loaded = False
+
+
+def sc(val, mn, mx, mp):
+    """Linear ramp: 0 at/below mn, mp at/above mx. Works on scalars and arrays."""
+    return np.clip((val - mn) / (mx - mn), 0.0, 1.0) * mp
+
+
+def _col(cols, k, n):
+    # dicts and DataFrames support `in`, structured arrays expose dtype.names
+    names = getattr(getattr(cols, "dtype", None), "names", None)
+    has = k in names if names is not None else k in cols
+    if not has: return np.zeros(n)
+    return np.asarray(cols[k], dtype=float)
+
+
+def _rows(cols):
+    for k in FIELDS:
+        try: return len(cols[k])
+        except (KeyError, ValueError, IndexError, TypeError): continue
+    return 0
+
+
+def load_params(path):
+    """Read a parameter file. Keys it doesn't mention keep their defaults."""
+    with open(path, "r", encoding="utf-8") as f: rec = json.load(f)
+    if rec.get("format", PARAMS_FORMAT) > PARAMS_FORMAT:
+        raise ValueError(f"{path}: parameter format {rec['format']} is newer than this engine")
+    p = dict(DEFAULT_PARAMS)
+    for k, val in rec.get("params", {}).items():
+        if k not in p: raise ValueError(f"{path}: unknown parameter {k!r}")
+        p[k] = dict(val) if k == "base" else tuple(val) if isinstance(val, list) else float(val)
+    return p
+
+
+def use_params(params):
+    """Make a params dict (or a parameter file path) the default for score(); None restores the built-ins."""
+    global PARAMS, _loaded
+    PARAMS = load_params(params) if isinstance(params, str) else (params or DEFAULT_PARAMS)
+    _loaded = True
+    return PARAMS
+
+
+def active_params():
+    global _loaded
+    if not _loaded:
+        _loaded = True
+        path = os.getenv("VORTEX_PARAMS")
+        if path is None:
+            import config
+            path = config.get("params_file")
+        if path:
+            try: use_params(path)
+            except (OSError, ValueError) as e: print(f"Ignoring parameter file {path}: {e}")
+    return PARAMS
+
+
+# Score terms in dependency order: (name, inputs, fn(x, params)), where x holds the
+# fields and every earlier term. Live (below) uses the inputs to recompute only
+# what an edited field feeds into.
+TERMS = (
+    ("constriction", ("lapse",), lambda x, p: sc(x["lapse"], *p["constriction"])),
+    ("drill", ("rh", "lapse"), lambda x, p: np.where(
+        (x["rh"] < p["drill_rh_max"]) & (x["lapse"] > p["drill_lapse"][0]),
+        sc(p["drill_rh_max"] - x["rh"], *p["drill_rh"]) + sc(x["lapse"], *p["drill_lapse"]), 0.0)),
+    ("wedge_moist", ("temp", "dew", "rh"), lambda x, p: sc(p["wedge_spread_ref"] - (x["temp"] - x["dew"]), *p["wedge_spread"])
+                                                        + sc(x["rh"], *p["wedge_rh"])),
+    ("wedge_mid", ("mid_rh",), lambda x, p: np.where(x["mid_rh"] > p["wedge_mid_rh"][0], sc(x["mid_rh"], *p["wedge_mid_rh"]), 0.0)),
+    ("big_cape", ("cape",), lambda x, p: x["cape"] > p["wedge_big_cape"]),
+    ("wedge_penalty", ("lapse", "big_cape"), lambda x, p: np.where(x["big_cape"], 0.0, sc(x["lapse"], *p["wedge_penalty"]))),
+    ("stove", ("lapse", "rh"), lambda x, p: (sc(x["lapse"], *p["stove_lapse_up"]) - sc(x["lapse"], *p["stove_lapse_down"]))
+                                            + sc(x["rh"], *p["stove_rh"])),
+    ("side", ("vtp", "constriction"), lambda x, p: sc(x["vtp"], *p["side_vtp"]) + (x["constriction"] * p["side_constriction"])),
+    ("boost", ("stp",), lambda x, p: np.where(x["stp"] > p["boost_stp"][0], sc(x["stp"], *p["boost_stp"]), 0.0)),
+    ("tight", ("constriction",), lambda x, p: x["constriction"] > p["boost_tight"]),
+    ("mv", ("srh", "stp"), lambda x, p: np.minimum(p["mv_max"], p["mv_base"] + sc(x["srh"], *p["mv_srh"]) + sc(x["stp"], *p["mv_stp"]))),
+    ("rain", ("pwat", "rh"), lambda x, p: np.minimum(p["rain_max"], p["rain_base"] + sc(x["pwat"], *p["rain_pwat"]) + sc(x["rh"], *p["rain_rh"]))),
+    ("pwr", ("cape", "srh", "stp", "constriction"), lambda x, p: ((x["cape"] * x["srh"]) / p["pwr_div"]) + (x["stp"] * p["pwr_stp"])
+                                                                 + (x["constriction"] * p["pwr_constriction"])),
+)
+
+
+def _combine(x, p, n):
+    """Terms -> the score() result dict."""
+    sh = {k: np.full(n, float(b)) for k, b in p["base"].items()}
+    sh["Drillbit"] += x["drill"]
+    sh["Wedge"] += x["wedge_moist"]
+    sh["Wedge"] += x["wedge_mid"]
+    sh["Wedge"] += np.where(x["big_cape"], p["wedge_big_cape_bonus"], 0.0)
+    sh["Wedge"] = np.maximum(p["wedge_floor"], sh["Wedge"] - x["wedge_penalty"])
+    sh["Stovepipe"] += x["stove"]
+    sh["Sidewinder"] += x["side"]
+
+    bst, tight = x["boost"], x["tight"]
+    sh["Drillbit"] += np.where(tight & (sh["Drillbit"] > 0), bst * p["boost_drill"], 0.0)
+    sh["Wedge"] += np.where(tight, 0.0, bst * p["boost_wedge"])
+    sh["Stovepipe"] += bst * p["boost_stove"]
+
+    tot = sum(sh.values())
+    return {
+        "weights": sh,
+        "shapes": {k: (w / tot) * 100 for k, w in sh.items()},
+        "Multi-Vortex": x["mv"],
+        "Rain Wrapped": x["rain"],
+        "pwr": x["pwr"],
+        "ef": ef_class(x["pwr"], p["ef_cuts"]),
+    }
+
+
+def score(cols, params=None):
+    """Score every row of a columnar table in one pass.
+
+    `cols` is anything indexable by field name (dict of arrays, DataFrame,
+    structured array). Missing fields count as 0, like an empty entry box.
+    `params` overrides the active thresholds (see DEFAULT_PARAMS).
+    Returns a dict with raw shape weights, shape percentages, Multi-Vortex,
+    Rain Wrapped, the raw power index and the EF class index per row.
+    """
+    p = params or active_params()
+    n = _rows(cols)
+    x = {k: _col(cols, k, n) for k in FIELDS}
+    for name, _, fn in TERMS: x[name] = fn(x, p)
+    return _combine(x, p, n)
+
+
+class Live:
+    """One sounding kept scored while it is edited.
+
+    update() recomputes only the terms downstream of the fields that changed
+    (lapse -> constriction, drill, wedge_penalty, stove, side, tight, pwr) and
+    recombines the shape weights, which is a handful of additions.
+    """
+
+    def __init__(self, v=None, params=None):
+        self.p = params or active_params()
+        self.x = {k: np.array([float((v or {}).get(k, 0.0))]) for k in FIELDS}
+        for name, _, fn in TERMS: self.x[name] = fn(self.x, self.p)
+        self.last = set()
+
+    def update(self, changes):
+        """changes: field -> float. Returns the score() dict for the current values (one row)."""
+        dirty = {k for k, val in changes.items() if k in FIELDS and self.x[k][0] != float(val)}
+        for k in dirty: self.x[k] = np.array([float(changes[k])])
+        self.last = set()
+        for name, deps, fn in TERMS:
+            if dirty.intersection(deps):
+                self.x[name] = fn(self.x, self.p)
+                dirty.add(name)
+                self.last.add(name)
+        return _combine(self.x, self.p, 1)
+
+
+def ef_class(pwr, cuts=EF_CUTS):
+    """EF ladder: index i such that pwr is above the first i cut-offs."""
+    return np.searchsorted(cuts, pwr, side="left")
+
+
+def to_values(raw):
+    """Entry/OCR strings -> floats the way calc() reads them ("1,5" -> 1.5, junk stripped, empty -> 0)."""
+    out = {}
+    for k, s in raw.items():
+        if not isinstance(s, str): continue
+        s = re.sub(r"[^0-9.]", "", s.replace(',', '.'))
+        out[k] = float(s) if s else 0.0
+    return out
+
+
+def score_one(v):
+    """Single sounding (dict of floats) -> (shape weights, mv, rain, ef label), as calc() shows it."""
+    r = score({k: [v.get(k, 0.0)] for k in FIELDS})
+    sh = {k: float(w[0]) for k, w in r["weights"].items()}
+    return sh, float(r["Multi-Vortex"][0]), float(r["Rain Wrapped"][0]), EF_LABELS[int(r["ef"][0])]
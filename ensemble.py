@@ -0,0 +1,87 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Monte Carlo uncertainty for a single sounding.
+
+The verified inputs are perturbed with per-field errors (absolute for
+temperatures / RH / lapse, relative for the big integrated values) plus a
+small chance of a misread digit (a value off by a factor of ten), and every
+sample goes through engine.score() in one vectorized call. 100k samples take
+a few tens of milliseconds.
+
+    python ensemble.py    # timing on a typical sounding
+"""
+
+import time
+
+import numpy as np
+
+import engine
+
+
+# field -> ("abs", sd in field units) or ("rel", sd as a fraction)
+ERRORS = {
+    "temp": ("abs", 1.0),
+    "dew": ("abs", 1.0),
+    "cape": ("rel", 0.10),
+    "3cape": ("rel", 0.15),
+    "srh": ("rel", 0.10),
+    "lapse": ("abs", 0.3),
+    "rh": ("abs", 3.0),
+    "mid_rh": ("abs", 3.0),
+    "pwat": ("abs", 0.1),
+    "stp": ("rel", 0.15),
+    "vtp": ("rel", 0.15),
+}
+MISREAD = 0.01  # per field and sample: dropped or extra digit / lost decimal point
+PCTS = (5, 25, 50, 75, 95)
+SIGNED = ("temp", "dew")
+PERCENT = ("rh", "mid_rh")
+
+
+def sample(v, n, errors=ERRORS, misread=MISREAD, rng=None):
+    """n perturbed copies of the sounding v, as a dict of columns."""
+    rng = rng if rng is not None else np.random.default_rng()
+    cols = {}
+    for k in engine.FIELDS:
+        x = float(v.get(k, 0.0))
+        kind, sd = errors.get(k, ("abs", 0.0))
+        noise = rng.standard_normal(n)
+        col = x + noise * sd if kind == "abs" else x * (1.0 + noise * sd)
+        if misread and x:
+            hit = rng.random(n) < misread
+            col[hit] *= np.where(rng.random(int(hit.sum())) < 0.5, 0.1, 10.0)
+        if k in PERCENT: np.clip(col, 0.0, 100.0, out=col)
+        elif k not in SIGNED: np.maximum(col, 0.0, out=col)
+        cols[k] = col
+    return cols
+
+
+def run(v, n=100_000, errors=ERRORS, misread=MISREAD, pcts=PCTS, seed=None):
+    """-> {"n", "ms", "bands": {output: {pct: value}}, "ef_prob": {label: p}}.
+
+    Outputs are the shape percentages, Multi-Vortex and Rain Wrapped."""
+    t0 = time.perf_counter()
+    r = engine.score(sample(v, n, errors, misread, np.random.default_rng(seed)))
+    outs = dict(r["shapes"])
+    outs["Multi-Vortex"] = r["Multi-Vortex"]
+    outs["Rain Wrapped"] = r["Rain Wrapped"]
+    bands = {}
+    for k, col in outs.items():
+        q = np.percentile(col, pcts)
+        bands[k] = {p: float(x) for p, x in zip(pcts, q)}
+    counts = np.bincount(r["ef"], minlength=len(engine.EF_LABELS))
+    ef_prob = {lab: float(c) / n for lab, c in zip(engine.EF_LABELS, counts)}
+    return {"n": n, "ms": (time.perf_counter() - t0) * 1000, "bands": bands, "ef_prob": ef_prob}
+
+
+if __name__ == "__main__":
+    v = {"temp": 84, "dew": 71, "cape": 3200, "3cape": 120, "srh": 380, "lapse": 8.2,
+         "rh": 72, "mid_rh": 65, "pwat": 1.6, "stp": 6.5, "vtp": 2.1}
+    run(v, 1000)
+    r = run(v, seed=0)
+    print(f"{r['n']:,} samples in {r['ms']:.1f} ms")
+    for k, b in r["bands"].items():
+        print(f"  {k:<13}" + "  ".join(f"p{p}={x:5.1f}" for p, x in b.items()))
+    print("  " + "  ".join(f"{k} {p:.1%}" for k, p in r["ef_prob"].items()))
@@ -0,0 +1,150 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Score whole model grids: one .npy per parameter in, rasters out.
+
+    python grid.py IN_DIR -o OUT_DIR                  # IN_DIR/temp.npy, dew.npy, cape.npy ...
+    python grid.py IN_DIR -o OUT_DIR --budget 256 -j 8
+
+Inputs are any shape (y, x) or (hour, y, x), all the same; a missing field
+counts as 0, like an empty entry box. The .npy headers are read memory-mapped;
+each worker process then reads one flat slice of cells at a time straight
+from the files (positioned reads, so pages of the whole grid never pile up
+in RSS), scores it with engine.score() and writes the slice into the output
+files. RAM use is set by --budget (MB across all workers), not by the grid
+size. Outputs, same shape as the inputs:
+
+    shape_<Name>.npy       probability of each shape (0..1, float32)
+    multi_vortex.npy       Multi-Vortex %, float32
+    rain_wrapped.npy       Rain Wrapped %, float32
+    ef.npy                 EF class index 0..5, uint8
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+import engine
+
+
+# engine.score() working set per cell: float64 inputs, shape weights and temporaries
+BYTES_PER_CELL = 8 * (len(engine.FIELDS) + 3 * len(engine.SHAPES) + 16)
+OUTPUTS = [f"shape_{s}" for s in engine.SHAPES] + ["multi_vortex", "rain_wrapped", "ef"]
+
+
+class NpyFile:
+    """Flat positioned reads/writes on a C-ordered .npy, without mapping it."""
+
+    def __init__(self, path, mode="rb"):
+        m = np.load(path, mmap_mode="r")
+        if m.ndim > 1 and not m.flags.c_contiguous: raise ValueError(f"{path}: Fortran-ordered arrays not supported")
+        self.shape, self.dtype, self.offset = m.shape, m.dtype, m.offset
+        del m
+        self.f = open(path, mode)
+
+    def read(self, lo, hi):
+        self.f.seek(self.offset + lo * self.dtype.itemsize)
+        return np.fromfile(self.f, self.dtype, hi - lo)
+
+    def write(self, lo, arr):
+        self.f.seek(self.offset + lo * self.dtype.itemsize)
+        np.ascontiguousarray(arr, self.dtype).tofile(self.f)
+
+    def close(self):
+        self.f.close()
+
+
+def open_inputs(in_dir):
+    """-> (field -> NpyFile, shape)."""
+    files, shape = {}, None
+    for k in engine.FIELDS:
+        p = os.path.join(in_dir, f"{k}.npy")
+        if not os.path.exists(p): continue
+        f = files[k] = NpyFile(p)
+        if shape is None: shape = f.shape
+        elif f.shape != shape: raise ValueError(f"{k}.npy is {f.shape}, expected {shape}")
+    if shape is None: raise FileNotFoundError(f"no <field>.npy files in {in_dir}")
+    return files, shape
+
+
+def open_outputs(out_dir, shape, create=False):
+    out = {}
+    for name in OUTPUTS:
+        p = os.path.join(out_dir, f"{name}.npy")
+        if create: open_memmap(p, "w+", np.uint8 if name == "ef" else np.float32, shape)  # header + sparse body
+        out[name] = NpyFile(p, "r+b")
+    return out
+
+
+def score_slice(inputs, outputs, lo, hi, params=None):
+    r = engine.score({k: f.read(lo, hi) for k, f in inputs.items()}, params)
+    for s in engine.SHAPES: outputs[f"shape_{s}"].write(lo, r["shapes"][s] / 100)
+    outputs["multi_vortex"].write(lo, r["Multi-Vortex"])
+    outputs["rain_wrapped"].write(lo, r["Rain Wrapped"])
+    outputs["ef"].write(lo, r["ef"])
+
+
+_W = {}
+
+
+def _init_worker(in_dir, out_dir, params):
+    _W["inputs"], shape = open_inputs(in_dir)
+    _W["outputs"] = open_outputs(out_dir, shape)
+    _W["params"] = params
+
+
+def _work(span):
+    score_slice(_W["inputs"], _W["outputs"], *span, _W["params"])
+
+
+def run(in_dir, out_dir, budget_mb=512, workers=None, params=None, log=sys.stderr):
+    """Score every cell. Returns (cells, seconds)."""
+    t0 = time.perf_counter()
+    inputs, shape = open_inputs(in_dir)
+    n = int(np.prod(shape))
+    os.makedirs(out_dir, exist_ok=True)
+    outputs = open_outputs(out_dir, shape, create=True)
+    workers = workers or os.cpu_count() or 1
+    params = params or engine.active_params()
+    chunk = max(4096, int(budget_mb * 1024 * 1024 / (BYTES_PER_CELL * workers)))
+    spans = [(lo, min(n, lo + chunk)) for lo in range(0, n, chunk)]
+    if log: print(f"{n:,} cells {shape}, {len(spans)} chunks of {chunk:,}, {workers} workers", file=log)
+
+    if workers == 1:
+        for lo, hi in spans: score_slice(inputs, outputs, lo, hi, params)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(in_dir, out_dir, params)) as pool:
+            pending = set()
+            for s in spans:
+                pending.add(pool.submit(_work, s))
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in finished: f.result()
+            for f in pending: f.result()
+    for f in (*inputs.values(), *outputs.values()): f.close()
+    return n, time.perf_counter() - t0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="grid", description="Score gridded parameter fields.")
+    ap.add_argument("inputs", help="directory with <field>.npy grids")
+    ap.add_argument("-o", "--out", required=True, help="directory for the output rasters")
+    ap.add_argument("--budget", type=float, default=512, help="working memory across workers, MB")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    ap.add_argument("--params", help="parameter file (default: active)")
+    args = ap.parse_args(argv)
+    params = engine.load_params(args.params) if args.params else None
+    n, dt = run(args.inputs, args.out, args.budget, args.workers, params)
+    print(f"{n:,} cells in {dt:.1f}s ({n / dt / 1e6:.1f} M cells/s) -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
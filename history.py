@@ -0,0 +1,237 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Append-only history of every scored sounding, with analog search.
+
+Layout: one raw little-endian file per column (ts.f8, cape.f4, ef.u1,
+thermo.s32 ...) in the history directory, plus meta.json holding the
+committed row count. An append writes the column files first and bumps
+meta.json last (atomic replace), so a crash mid-append leaves at most a
+torn tail that the next open cuts off. Columns are read memory-mapped.
+
+- between(t0, t1): rows by time, binary search while timestamps stay sorted
+- query(cape=(1000, 3000), srh=(200, None)): range filters, the narrowest
+  through a per-column sorted index, the rest as masks
+- analogs(v, k): k nearest past soundings in standardized parameter space,
+  through scipy's cKDTree when installed, else one vectorized distance
+  pass (a few ms at 500k rows)
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+import engine
+
+
+FORMAT = 1
+COLUMNS = {"ts": "<f8", **{k: "<f4" for k in engine.FIELDS}, "speed": "<f4",
+           **{f"shape_{s}": "<f4" for s in engine.SHAPES}, "multi_vortex": "<f4", "rain_wrapped": "<f4",
+           "ef": "u1", "thermo": "S32", "comp": "S32", "source": "S8"}
+EXT = {"<f8": "f8", "<f4": "f4", "u1": "u1", "S32": "s32", "S8": "s8"}
+
+
+def default_dir():
+    return os.getenv("VORTEX_HISTORY_DIR") or config.data_dir("history")
+
+
+class History:
+    def __init__(self, path=None):
+        self.path = path or default_dir()
+        os.makedirs(self.path, exist_ok=True)
+        self.lock = threading.RLock()  # appends run on a background thread while the UI reads
+        self.rows = self._read_meta()
+        self._repair()
+        self._cols = {}
+        self._order = {}
+        self._tree = None
+
+    def _file(self, col):
+        return os.path.join(self.path, f"{col}.{EXT[COLUMNS[col]]}")
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, "meta.json")) as f: meta = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if meta.get("format", FORMAT) > FORMAT: raise ValueError(f"{self.path}: history format {meta['format']} is too new")
+        return int(meta.get("rows", 0))
+
+    def _write_meta(self):
+        p = os.path.join(self.path, "meta.json")
+        with open(p + ".tmp", "w") as f: json.dump({"format": FORMAT, "rows": self.rows, "columns": COLUMNS}, f)
+        os.replace(p + ".tmp", p)
+
+    def _repair(self):
+        """Cut column files back to the committed row count (and shrink it if a column is short)."""
+        for col, dt in COLUMNS.items():
+            p, size = self._file(col), np.dtype(dt).itemsize
+            have = os.path.getsize(p) // size if os.path.exists(p) else 0
+            self.rows = min(self.rows, have)
+        for col, dt in COLUMNS.items():
+            p = self._file(col)
+            want = self.rows * np.dtype(dt).itemsize
+            if not os.path.exists(p): open(p, "wb").close()
+            elif os.path.getsize(p) != want:
+                with open(p, "r+b") as f: f.truncate(want)
+
+    def __len__(self):
+        return self.rows
+
+    # ---- writing ----
+
+    def append(self, v, result, hashes=("", ""), source="overlay", ts=None):
+        """One run: v = input floats, result = engine.score_one() output. Returns the row number."""
+        sh, mv, rain, ef = result
+        tot = sum(sh.values()) or 1.0
+        rec = {"ts": time.time() if ts is None else ts, "speed": v.get("speed", 0.0),
+               "multi_vortex": mv, "rain_wrapped": rain,
+               "ef": engine.EF_LABELS.index(ef) if isinstance(ef, str) else ef,
+               "thermo": hashes[0] or "", "comp": hashes[1] or "", "source": source}
+        rec.update({k: v.get(k, 0.0) for k in engine.FIELDS})
+        rec.update({f"shape_{s}": sh.get(s, 0.0) / tot * 100 for s in engine.SHAPES})
+        return self.extend({k: [x] for k, x in rec.items()})
+
+    def extend(self, cols):
+        """Append many rows given as column lists/arrays (missing columns are zero). Returns the first new row."""
+        n = max(len(x) for x in cols.values())
+        with self.lock:
+            first = self.rows
+            for col, dt in COLUMNS.items():
+                a = np.zeros(n, dt) if col not in cols else np.asarray(
+                    [str(x).encode() if not isinstance(x, bytes) else x for x in cols[col]] if dt[0] == "S" else cols[col], dt)
+                with open(self._file(col), "ab") as f: a.tofile(f)
+            self.rows += n
+            self._write_meta()
+            self._cols.clear()
+        return first
+
+    # ---- reading ----
+
+    def col(self, name):
+        """Column as a read-only array (memory-mapped)."""
+        with self.lock:
+            a = self._cols.get(name)
+            if a is None or len(a) != self.rows:
+                a = np.memmap(self._file(name), COLUMNS[name], "r", shape=(self.rows,)) if self.rows else np.zeros(0, COLUMNS[name])
+                self._cols[name] = a
+            return a
+
+    def row(self, i):
+        out = {}
+        for k in COLUMNS:
+            x = self.col(k)[i]
+            out[k] = x.decode() if isinstance(x, bytes) else x.item()
+        out["ef_label"] = engine.EF_LABELS[out["ef"]]
+        return out
+
+    def _sorted(self, name):
+        """-> (permutation sorting the column, or None if it is already sorted; sorted values)."""
+        hit = self._order.get(name)
+        if hit is None or hit[0] != self.rows:
+            c = self.col(name)
+            # timestamps normally arrive in order; then the column is its own index
+            o = None if self.rows < 2 or bool(np.all(c[1:] >= c[:-1])) else np.argsort(c, kind="stable")
+            hit = self._order[name] = (self.rows, o, c if o is None else c[o])
+        return hit[1], hit[2]
+
+    def _bounds(self, name, lo, hi):
+        o, s = self._sorted(name)
+        i = 0 if lo is None else int(np.searchsorted(s, lo, "left"))
+        j = len(s) if hi is None else int(np.searchsorted(s, hi, "right"))
+        return o, i, j
+
+    def _range(self, name, lo, hi):
+        o, i, j = self._bounds(name, lo, hi)
+        return np.arange(i, j) if o is None else np.sort(o[i:j])
+
+    def between(self, t0=None, t1=None):
+        """Row numbers with t0 <= ts <= t1 (epoch seconds)."""
+        return self._range("ts", t0, t1)
+
+    def query(self, **ranges):
+        """Row numbers inside every (lo, hi) range given (None = open end)."""
+        if not ranges: return np.arange(self.rows)
+        # narrowest range through its sorted index, the rest as masks over those rows
+        first = min(ranges, key=lambda k: (lambda o, i, j: j - i)(*self._bounds(k, *ranges[k])))
+        rows = self._range(first, *ranges[first])
+        for k, (lo, hi) in ranges.items():
+            if k == first: continue
+            c = self.col(k)[rows]
+            keep = np.ones(len(rows), bool)
+            if lo is not None: keep &= c >= lo
+            if hi is not None: keep &= c <= hi
+            rows = rows[keep]
+        return rows
+
+    # ---- analogs ----
+
+    def _features(self, fields):
+        X = np.stack([np.asarray(self.col(k), dtype=np.float32) for k in fields], axis=1)
+        mu, sd = X.mean(0), X.std(0)
+        sd[sd == 0] = 1.0
+        return (X - mu) / sd, mu, sd
+
+    def analogs(self, v, k=10, fields=engine.FIELDS, exclude_last=False, exact=False):
+        """k most similar past soundings to v -> list of (row, distance), nearest first.
+
+        Rows identical to v in every field (v itself, or the same values scored
+        again) are left out unless exact is set."""
+        if exact: return self._nearest(v, k, fields, exclude_last)
+        q = {f: np.float32(v.get(f, 0.0)) for f in fields}
+        want = k
+        while True:
+            out = self._nearest(v, want, fields, exclude_last)
+            keep = [r for r in out if any(self.col(f)[r[0]] != q[f] for f in fields)]
+            if len(keep) >= k or len(out) < want: return keep[:k]
+            want *= 2
+
+    def _nearest(self, v, k, fields, exclude_last):
+        n = self.rows - (1 if exclude_last else 0)
+        if n <= 0: return []
+        with self.lock:
+            t = self._tree
+            if t is None or t["fields"] != tuple(fields) or t["rows"] < self.rows * 0.9:
+                X, mu, sd = self._features(fields)
+                t = {"fields": tuple(fields), "rows": self.rows, "X": X, "mu": mu, "sd": sd,
+                     "xx": np.einsum("ij,ij->i", X, X), "kd": None}
+                try:
+                    from scipy.spatial import cKDTree
+                    t["kd"] = cKDTree(X)
+                except ImportError:
+                    pass
+                self._tree = t
+        q = (np.array([v.get(f, 0.0) for f in fields], np.float32) - t["mu"]) / t["sd"]
+        m = min(t["rows"], n)
+        if t["kd"] is not None:
+            d, idx = t["kd"].query(q, k=min(k, m))
+            d, idx = np.atleast_1d(d), np.atleast_1d(idx)
+            idx = idx[idx < m]
+            d = d[:len(idx)]
+        else:
+            d2 = t["xx"][:m] - 2 * (t["X"][:m] @ q) + q @ q
+            idx = np.argpartition(d2, min(k, m) - 1)[:k] if m > k else np.arange(m)
+            idx = idx[np.argsort(d2[idx])]
+            d = np.sqrt(np.maximum(d2[idx], 0))
+        out = list(zip(idx.tolist(), d.tolist()))
+        # rows appended since the index was built: plain distances
+        if m < n:
+            tail = np.stack([np.asarray(self.col(f)[m:n], np.float32) for f in fields], axis=1)
+            dt = np.sqrt((((tail - t["mu"]) / t["sd"] - q) ** 2).sum(1))
+            out += list(zip(range(m, n), dt.tolist()))
+            out.sort(key=lambda x: x[1])
+        return out[:k]
+
+
+_history = None
+
+
+def get():
+    global _history
+    if _history is None: _history = History()
+    return _history
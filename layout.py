@@ -0,0 +1,178 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Layout mode for a panel: find where each label's value sits once (from a
+full OCR pass with word boxes), then on later images OCR only those small
+value cells, digits only and one line each.
+
+Cells are stored as fractions of the panel size so a template survives a
+slightly different crop; anything that doesn't read back cleanly sends the
+caller back to a full pass, which relearns the template.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+
+import cv2
+
+import config
+
+
+DIGITS = "0123456789.-"
+CELL_PSM = 7  # single text line
+MIN_FIELDS = 3
+# confidence of a value read from a learned cell: the label position is known, only the digits can be off
+CELL_CONF = 0.9
+NUM_RE = re.compile(r"-?\d[\d.]*")
+
+
+def group_lines(words):
+    """backend.words() output -> list of lines (reading order), each sorted left to right."""
+    lines, order = {}, []
+    for w in words:
+        if w["line"] not in lines:
+            lines[w["line"]] = []
+            order.append(w["line"])
+        lines[w["line"]].append(w)
+    return [sorted(lines[k], key=lambda w: w["box"][0]) for k in order]
+
+
+def words_to_text(words):
+    return "\n".join(" ".join(w["text"] for w in ws) for ws in group_lines(words))
+
+
+class Layout:
+    def __init__(self, size, cells):
+        self.size = tuple(size)  # (w, h) of the image it was learned on
+        self.cells = cells       # field -> (x0, y0, x1, y1) as fractions of w/h
+
+    @classmethod
+    def learn(cls, words, shape, patterns, normalize):
+        """Build a layout from word boxes. patterns is field -> label regexes
+        (ocr.FIELD_PATTERNS), normalize the OCR clean-up applied before matching."""
+        h_img, w_img = shape[:2]
+        # per line: normalized text plus the char offset where each word starts
+        parsed = []
+        for ws in group_lines(words):
+            offs, pos, parts = [], 0, []
+            for w in ws:
+                t = normalize(w["text"])
+                offs.append(pos)
+                parts.append(t)
+                pos += len(t) + 1
+            parsed.append((ws, offs, " ".join(parts)))
+
+        cells = {}
+        for field, pats in patterns.items():
+            box = None
+            for p in pats:
+                for ws, offs, text in parsed:
+                    m = re.search(p, text, re.IGNORECASE)
+                    if not m: continue
+                    for i, (w, o) in enumerate(zip(ws, offs)):
+                        if o >= m.end() and re.search(r"\d", normalize(w["text"])):
+                            prev = ws[i - 1]["box"][2] if i else 0
+                            nxt = ws[i + 1]["box"][0] if i + 1 < len(ws) else w_img
+                            box = cls._cell(w["box"], prev, nxt, w_img, h_img)
+                            break
+                    if box: break
+                if box: break
+            if box: cells[field] = box
+        if len(cells) < MIN_FIELDS: return None
+        return cls((w_img, h_img), cells)
+
+    @staticmethod
+    def _cell(box, prev_x1, next_x0, w_img, h_img):
+        x0, y0, x1, y1 = box
+        h = max(1, y1 - y0)
+        # room for an extra digit on either side, but never into the neighbouring words
+        cx0 = max(prev_x1 + 1, x0 - h * 0.5, 0)
+        cx1 = min(next_x0 - 1, x1 + max(h, (x1 - x0) * 0.5), w_img)
+        cy0 = max(0, y0 - h * 0.3)
+        cy1 = min(h_img, y1 + h * 0.3)
+        return (cx0 / w_img, cy0 / h_img, cx1 / w_img, cy1 / h_img)
+
+    def fits(self, shape):
+        h, w = shape[:2]
+        return abs((w / h) / (self.size[0] / self.size[1]) - 1) < 0.15
+
+    def crops(self, img):
+        h, w = img.shape[:2]
+        bg = 255 if img.mean() > 127 else 0
+        out = []
+        for field, (fx0, fy0, fx1, fy1) in self.cells.items():
+            x0, y0 = int(fx0 * w), int(fy0 * h)
+            x1, y1 = max(x0 + 2, int(round(fx1 * w))), max(y0 + 2, int(round(fy1 * h)))
+            cell = img[y0:y1, x0:x1]
+            # tesseract reads tight crops badly without a margin
+            out.append((field, cv2.copyMakeBorder(cell, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=bg)))
+        return out
+
+    def read(self, img, backend):
+        """OCR every value cell in parallel. Returns field -> number string ('' if unreadable)."""
+        crops = self.crops(img)
+        txts = backend.text_many([c for _, c in crops], psm=CELL_PSM, whitelist=DIGITS)
+        out = {}
+        for (field, _), t in zip(crops, txts):
+            m = NUM_RE.search(t)
+            out[field] = m.group(0).rstrip('.') if m else ""
+        return out
+
+    def to_json(self):
+        return {"size": list(self.size), "cells": {k: list(v) for k, v in self.cells.items()}}
+
+    @classmethod
+    def from_json(cls, d):
+        return cls(d["size"], {k: tuple(v) for k, v in d["cells"].items()})
+
+
+def default_path():
+    return os.getenv("VORTEX_LAYOUT_FILE") or config.data_dir("layout.json")
+
+
+_layouts = None
+_lock = threading.Lock()
+
+
+def _load():
+    global _layouts
+    if _layouts is None:
+        try:
+            with open(default_path(), "r", encoding="utf-8") as f:
+                _layouts = {k: Layout.from_json(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, KeyError):
+            _layouts = {}
+    return _layouts
+
+
+def get(kind):
+    with _lock: return _load().get(kind)
+
+
+def put(kind, lay):
+    """Remember a template for this session and save it for the next one."""
+    with _lock:
+        _load()[kind] = lay
+        p = default_path()
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(p), exist_ok=True)
+            # a private temp file per writer: batch workers may save the same template at once
+            fd, tmp = tempfile.mkstemp(prefix=".layout-", suffix=".tmp", dir=os.path.dirname(p))
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({k: v.to_json() for k, v in _layouts.items()}, f, indent=1)
+            os.replace(tmp, p)
+            tmp = None
+        except OSError: pass
+        finally:
+            if tmp:
+                try: os.remove(tmp)
+                except OSError: pass
+
+
+def forget(kind):
+    with _lock: _load().pop(kind, None)
@@ -0,0 +1,188 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Preprocessing, tesseract and text parsing shared by the overlay and the batch tools."""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytesseract
+
+import backends
+import cache
+import config
+import extract
+import layout
+import pipeline
+import tiles
+import tracing
+
+
+PIPELINE = pipeline.Pipeline()
+
+
+def preprocess(pil_img, stats=None):
+    with tracing.span("preprocess"):
+        return PIPELINE.run(pil_img, stats)
+
+
+# bump when parse_data() changes so cached extractions are redone
+PARSE_VERSION = 2
+PSM = 6
+# OCR only the learned value cells of the thermodynamics panel (see layout.py)
+LAYOUT = os.getenv("VORTEX_LAYOUT") == "1"
+MULTI = os.getenv("VORTEX_MULTI") == "1" or bool(config.get("multi_variant", False))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def ocr_version():
+    b = backends.get_backend()
+    try: tv = str(pytesseract.get_tesseract_version())
+    except Exception: tv = "?"
+    tl = tiles.MIN_PX if tiles.ENABLED else 0
+    return f"{b.name}|{tv}|psm{PSM}|parse{PARSE_VERSION}|tiles{tl}"
+
+
+def get_cache():
+    """Session OCR cache, or None when VORTEX_NO_CACHE is set."""
+    global _cache
+    if os.getenv("VORTEX_NO_CACHE"): return None
+    with _cache_lock:
+        if _cache is None: _cache = cache.OcrCache(version=ocr_version())
+        return _cache
+
+
+def texts(imgs, keys=None):
+    """OCR thresholded images, skipping tesseract for any image seen before."""
+    b = backends.get_backend()
+    c = get_cache()
+    if c is None:
+        with tracing.span("tesseract", n=len(imgs)): return tiles.text_many(b, imgs, PSM)
+    keys = keys or [cache.image_key(im) for im in imgs]
+    out = [(c.get(k) or {}).get("text") for k in keys]
+    miss = [i for i, t in enumerate(out) if t is None]
+    if miss:
+        with tracing.span("tesseract", n=len(miss)): found = tiles.text_many(b, [imgs[i] for i in miss], PSM)
+        for i, t in zip(miss, found):
+            out[i] = t
+            c.put(keys[i], {"text": t})
+    return out
+
+
+# regex label aliases per field (legacy parser and layout learning); the first number after a label is the value
+FIELD_PATTERNS = {
+    "temp": [r"TEMPERATURE", r"TEMP"],
+    "dew": [r"DEW\s*P[O0Q@ØoD]INT", r"P[O0Q@ØoD]INT", r"DEWPOINT", r"DEW"],
+    "3cape": [r"3\s*CAPE", r"3CAPE"],
+    "cape": [r"(?<!3)CAPE"],
+    "lapse": [r"0-3\s*[Kk]?[Mm]?\s*LAPSE", r"0-3\s*LAPSE", r"0-3"],
+    "srh": [r"SRH"],
+    "rh": [r"SURFACE\s*RH", r"SFC\s*RH"],
+    "mid_rh": [r"MB\s*RH", r"500\s*MB", r"MID\s*RH"],
+    "pwat": [r"PWAT"],
+    "stp": [r"STP", r"SIP", r"S\.T\.P", r"3TP", r"3\s*T\s*P"],
+    "vtp": [r"VTP", r"VIP", r"V\.T\.P", r"3TP", r"3\s*T\s*P"],
+}
+
+
+def normalize(text):
+    text = text.replace("Q", "0").replace("O", "0").replace("o", "0")
+    text = text.replace("@", "0").replace("Ø", "0").replace("D", "0")
+    return text.replace("theta", "0")
+
+
+def fix_pwat(raw_pwat):
+    if not raw_pwat: return raw_pwat
+    if re.match(r"^7\.\d+$", raw_pwat): raw_pwat = "1" + raw_pwat[1:]
+    try:
+        f = float(raw_pwat)
+        f = round(f, 1)
+        if f > 4.0:
+            if f == 7.0: f = 1.0
+            elif f >= 10: f = f / 10
+            else: f = 1.5
+        raw_pwat = str(f)
+    except: pass
+    return raw_pwat
+
+
+def parse_data(text):
+    with tracing.span("parse"): vals, conf = extract.extract(text)
+    data = dict(vals)
+    data["pwat"] = fix_pwat(data["pwat"])
+    data["conf"] = conf
+    data["raw"] = text
+    return data
+
+
+def legacy_parse_data(text):
+    """The old regex cascade, kept for comparison benchmarks."""
+    text = normalize(text)
+
+    def find(patterns):
+        for p in patterns:
+            match = re.search(p + r".*?(\d[\d\.]*)", text, re.IGNORECASE)
+            if match: return match.group(1).rstrip('.')
+        return ""
+
+    data = {k: find(p) for k, p in FIELD_PATTERNS.items()}
+    data["pwat"] = fix_pwat(data["pwat"])
+    data["raw"] = text
+    return data
+
+
+def _read_thermo_layout(thresh):
+    """Thermo panel through its layout template. Returns (text, values from cells or None)."""
+    b = backends.get_backend()
+    lay = layout.get("thermo")
+    if lay is not None and lay.fits(thresh.shape):
+        vals = lay.read(thresh, b)
+        if sum(1 for v in vals.values() if v) >= len(vals) - 1:
+            return "\n".join(f"{k.upper()} {v}" for k, v in vals.items()), vals
+    # no template yet, or it stopped matching: one full pass with word boxes, relearn
+    words = b.words(thresh, PSM)
+    lay = layout.Layout.learn(words, thresh.shape, FIELD_PATTERNS, normalize)
+    if lay is not None: layout.put("thermo", lay)
+    else: layout.forget("thermo")
+    return layout.words_to_text(words), None
+
+
+def _parse_layout(imgs):
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        fut = ex.submit(tracing.wrap(texts), [imgs[1]])
+        with tracing.span("tesseract.layout"): txt_t, vals = _read_thermo_layout(imgs[0])
+        txt_c = fut.result()[0]
+    if vals is None: return parse_data(txt_t + "\n" + txt_c)
+    data = parse_data(txt_c)
+    for k, v in vals.items():
+        if v:
+            data[k] = fix_pwat(v) if k == "pwat" else v
+            data["conf"][k] = layout.CELL_CONF
+    data["raw"] = txt_t + "\n" + data["raw"]
+    return data
+
+
+def read_pair(thermo_img, comp_img, use_layout=None, multi=None):
+    """OCR a thermodynamics/composite pair and parse it into extracted_data."""
+    if MULTI if multi is None else multi:
+        import variants
+        return variants.read_pair(thermo_img, comp_img)
+    use_layout = LAYOUT if use_layout is None else use_layout
+    imgs = [preprocess(thermo_img), preprocess(comp_img)]
+    c = get_cache()
+    keys = [cache.image_key(im) for im in imgs] if c else None
+    pk = cache.combine_keys(*keys, "layout" if use_layout else "pair") if c else None
+    hit = c.get(pk) if c else None
+    if hit is not None: return dict(hit)
+    if use_layout:
+        data = _parse_layout(imgs)
+    else:
+        txt_t, txt_c = texts(imgs, keys)
+        data = parse_data(txt_t + "\n" + txt_c)
+    if c: c.put(pk, data)
+    return data
@@ -0,0 +1,137 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Image preprocessing ahead of tesseract, as a list of named stages.
+
+Each stage is fn(img, ctx) -> img; ctx carries the pipeline settings and
+anything a stage measured (e.g. glyph height, chosen scale). The default
+chain is gray -> scale -> threshold:
+
+- gray goes from the PIL buffer straight to one 8-bit plane (no RGB/BGR round trip)
+- scale measures the text height and only resizes as far as needed to reach
+  target_px, so big text isn't quadrupled for nothing
+- threshold is Otsu, inverted, in place when the buffer allows it
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+def to_gray(img, ctx):
+    if isinstance(img, np.ndarray):
+        if img.ndim == 2: return img
+        bgr = getattr(img, "channels", "RGB").startswith("BGR")  # capture.Frame from a native grab
+        code = {3: (cv2.COLOR_RGB2GRAY, cv2.COLOR_BGR2GRAY), 4: (cv2.COLOR_RGBA2GRAY, cv2.COLOR_BGRA2GRAY)}[img.shape[2]][bgr]
+        ctx["owned"] = True
+        return cv2.cvtColor(img, code)
+    # PIL does the luma conversion in C on its own buffer; only the 1-byte plane is copied out
+    return np.asarray(img if img.mode == "L" else img.convert("L"))
+
+
+def cv_gray(img, ctx):
+    """OpenCV's luma weights, as the original preprocess() used; PIL's convert("L") rounds differently."""
+    if not isinstance(img, np.ndarray): img = np.asarray(img if img.mode in ("RGB", "L") else img.convert("RGB"))
+    return to_gray(img, ctx)
+
+
+def glyph_height(gray, max_px=400_000):
+    """Median height in px of text-sized connected components, or None if nothing looks like text.
+
+    Large frames are measured on a 1/2 or 1/4 INTER_AREA thumbnail (power-of-two
+    factors take OpenCV's fast path); a component pass over the full frame would
+    cost more than the OCR it saves.
+    """
+    f = 1.0
+    while gray.size * f * f > max_px and f > 0.25: f /= 2
+    if f < 1.0: gray = cv2.resize(gray, None, fx=f, fy=f, interpolation=cv2.INTER_AREA)
+    _, bw = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    if bw.mean() > 127: bw = cv2.bitwise_not(bw)  # text is the minority class either way
+    # 16-bit labels are much faster and can't overflow below ~130k px (8-connectivity)
+    ltype = cv2.CV_16U if bw.size < 130_000 else cv2.CV_32S
+    n, _, stats, _ = cv2.connectedComponentsWithStats(bw, connectivity=8, ltype=ltype)
+    if n <= 1: return None
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    a = stats[1:, cv2.CC_STAT_AREA]
+    # drop specks, rules/borders and filled blocks
+    ok = (h >= max(2, 4 * f)) & (a >= max(3, 8 * f * f)) & (h < gray.shape[0] * 0.5) & (w < h * 4)
+    if ok.sum() < 3: return None
+    return float(np.median(h[ok])) / f
+
+
+def adaptive_scale(img, ctx):
+    lo, hi = ctx["min_scale"], ctx["max_scale"]
+    if lo == hi:
+        s = lo
+    else:
+        gh = glyph_height(img)
+        ctx["glyph_px"] = gh
+        s = hi if gh is None else min(hi, max(lo, ctx["target_px"] / gh))
+        s = round(s * 4) / 4  # a few discrete factors keep the OCR cache useful
+    ctx["scale"] = s
+    if s == 1: return img
+    interp = cv2.INTER_CUBIC if s > 1 else cv2.INTER_AREA
+    ctx["owned"] = True
+    return cv2.resize(img, None, fx=s, fy=s, interpolation=interp)
+
+
+def otsu_inv(img, ctx):
+    # reuse the buffer only if an earlier stage allocated it (never the caller's array)
+    dst = img if ctx.get("owned") and img.flags.writeable else None
+    _, thresh = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU, dst=dst)
+    return thresh
+
+
+def otsu(img, ctx):
+    """Otsu without inversion: keeps the panel's light-on-dark polarity."""
+    dst = img if ctx.get("owned") and img.flags.writeable else None
+    _, thresh = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst)
+    return thresh
+
+
+def adaptive_inv(img, ctx):
+    """Local (Gaussian-weighted) threshold, inverted; copes with gradients and glow behind text."""
+    return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 10)
+
+
+def invert(img, ctx):
+    """No threshold at all, dark-on-light gray; tesseract binarizes it itself."""
+    dst = img if ctx.get("owned") and img.flags.writeable else None
+    return cv2.bitwise_not(img, dst=dst)
+
+
+DEFAULT_STAGES = (("gray", to_gray), ("scale", adaptive_scale), ("threshold", otsu_inv))
+
+
+class Pipeline:
+    def __init__(self, stages=DEFAULT_STAGES, target_px=30, min_scale=1.0, max_scale=2.0):
+        self.stages = list(stages)
+        self.settings = {"target_px": target_px, "min_scale": min_scale, "max_scale": max_scale}
+        self.totals = {n: 0.0 for n, _ in self.stages}
+        self.runs = 0
+
+    def run(self, img, stats=None):
+        """Run every stage. If stats is a dict it gets per-stage ms plus whatever stages measured."""
+        ctx = dict(self.settings)
+        times = {}
+        for name, fn in self.stages:
+            t0 = time.perf_counter()
+            img = fn(img, ctx)
+            times[name] = (time.perf_counter() - t0) * 1000
+        for n, ms in times.items(): self.totals[n] = self.totals.get(n, 0.0) + ms
+        self.runs += 1
+        if stats is not None:
+            stats.update({k: v for k, v in ctx.items() if k not in self.settings and k != "owned"})
+            stats["ms"] = times
+        return img
+
+    def mean_ms(self):
+        return {n: t / self.runs for n, t in self.totals.items()} if self.runs else {}
+
+
+def legacy():
+    """The original fixed 2x upscale, for comparison (same output as the old preprocess())."""
+    return Pipeline((("gray", cv_gray),) + DEFAULT_STAGES[1:], min_scale=2.0, max_scale=2.0)
@@ -0,0 +1,288 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Headless scoring service for other tools.
+
+    python server.py                          # http://127.0.0.1:8765
+    python server.py --unix /tmp/vortex.sock  # HTTP over a Unix socket
+    python Vortex.py serve -j 4 --queue 16
+
+Endpoints (JSON in, JSON out):
+    POST /score    {"temp": 84, "dew": 71, ...}                  -> scores
+    POST /ocr      {"thermo": <base64 image>, "comp": <base64>}   -> extracted values + scores
+                   (or multipart/form-data with thermo/comp file parts)
+    GET  /metrics  queue depth, in flight, counters, latency percentiles
+    GET  /health
+
+OCR jobs run on a process pool. At most workers + queue jobs are admitted
+at once. Past that, requests get 503 with Retry-After straight away instead
+of piling up. Each request waits at most --timeout seconds (504 after that).
+The slot stays taken until the job really finishes, so the bound is real.
+Concurrent connections are capped separately.
+"""
+
+import argparse
+import base64
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+MAX_BODY = 32 * 1024 * 1024
+
+
+def result(v):
+    """Engine output for one sounding as plain JSON."""
+    import engine
+    sh, mv, rain, ef = engine.score_one(v)
+    tot = sum(sh.values())
+    return {"shapes": {k: round(w / tot * 100, 2) for k, w in sh.items()},
+            "Multi-Vortex": round(mv, 2), "Rain Wrapped": round(rain, 2), "ef": ef}
+
+
+def _values(d):
+    import engine
+    if not isinstance(d, dict): raise TypeError(f"expected a JSON object, got {type(d).__name__}")
+    keys = (*engine.FIELDS, "speed")
+    for k in keys:
+        if isinstance(d.get(k), bool): raise TypeError(f"{k}: expected a number, got a boolean")
+    # numbers are taken as they are (sign, exponent); only strings get the entry-box cleanup
+    v = engine.to_values({k: d.get(k) or "" for k in keys if not isinstance(d.get(k), (int, float))})
+    v.update({k: float(d[k]) for k in keys if isinstance(d.get(k), (int, float))})
+    if not v.get("speed"): v["speed"] = 60.0
+    return v
+
+
+def _ocr_job(thermo, comp):
+    from io import BytesIO
+    from PIL import Image
+    import ocr
+    t0 = time.perf_counter()
+    imgs = []
+    for name, b in (("thermo", thermo), ("comp", comp)):
+        try:
+            with Image.open(BytesIO(b)) as im: imgs.append(im.convert("RGB"))
+        except OSError as e:  # UnidentifiedImageError, truncated files
+            raise ValueError(f"{name}: not a readable image ({e})") from None
+    data = ocr.read_pair(*imgs)
+    return {"data": data, "result": result(_values(data)), "worker_ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+
+class Busy(Exception):
+    pass
+
+
+class Service:
+    def __init__(self, workers=None, queue=None, timeout=30.0, max_clients=64):
+        import batch
+        import backends
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + (self.workers * 2 if queue is None else queue)
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.clients = threading.BoundedSemaphore(max_clients)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=batch._init_worker,
+                                        initargs=(backends.get_backend().name, False))
+        self.lock = threading.Lock()
+        self.admitted = 0
+        self.counts = {"ok": 0, "rejected": 0, "timeout": 0, "error": 0, "bad_request": 0}
+        self.lat = {"score": deque(maxlen=2000), "ocr": deque(maxlen=2000)}
+        self.started = time.time()
+
+    def _release(self, _fut):
+        with self.lock: self.admitted -= 1
+        self.slots.release()
+
+    def ocr(self, thermo, comp):
+        if not self.slots.acquire(blocking=False): raise Busy()
+        with self.lock: self.admitted += 1
+        try:
+            fut = self.pool.submit(_ocr_job, thermo, comp)
+        except Exception:
+            self._release(None)
+            raise
+        fut.add_done_callback(self._release)
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            fut.cancel()  # only helps if it hasn't started; otherwise its slot frees when it ends
+            raise
+
+    def count(self, key, kind=None, ms=None):
+        with self.lock:
+            self.counts[key] += 1
+            if kind and ms is not None: self.lat[kind].append(ms)
+
+    def metrics(self):
+        import numpy as np
+        with self.lock:
+            admitted = self.admitted
+            lat = {k: list(v) for k, v in self.lat.items()}
+            counts = dict(self.counts)
+        out = {"uptime_s": round(time.time() - self.started, 1), "workers": self.workers, "capacity": self.capacity,
+               "in_flight": min(admitted, self.workers), "queue_depth": max(0, admitted - self.workers),
+               "counts": counts, "latency_ms": {}}
+        for k, xs in lat.items():
+            if xs:
+                p = np.percentile(xs, (50, 90, 99))
+                out["latency_ms"][k] = {"n": len(xs), "p50": round(float(p[0]), 2), "p90": round(float(p[1]), 2),
+                                        "p99": round(float(p[2]), 2), "max": round(max(xs), 2)}
+        return out
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _multipart(ctype, body):
+    from email.parser import BytesParser
+    from email.policy import HTTP
+    msg = BytesParser(policy=HTTP).parsebytes(b"Content-Type: " + ctype.encode() + b"\r\n\r\n" + body)
+    return {p.get_param("name", header="content-disposition"): p.get_payload(decode=True) for p in msg.iter_parts()}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "Vortex"
+    service = None
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose: sys.stderr.write(f"{self.address_string()} {fmt % args}\n")
+
+    def _send(self, code, obj, headers=()):
+        body = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers: self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY: raise OverflowError(n)
+        return self.rfile.read(n)
+
+    def do_GET(self):
+        if self.path == "/metrics": self._send(200, self.service.metrics())
+        elif self.path == "/health": self._send(200, {"ok": True})
+        else: self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        svc = self.service
+        if not svc.clients.acquire(blocking=False):
+            svc.count("rejected")
+            self._send(503, {"error": "too many connections"}, [("Retry-After", "1")])
+            return
+        t0 = time.perf_counter()
+        try:
+            if self.path not in ("/score", "/ocr"):
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                body = self._body()
+            except OverflowError:
+                svc.count("bad_request")
+                self.close_connection = True
+                self._send(413, {"error": f"body over {MAX_BODY} bytes"})
+                return
+            ctype = self.headers.get("Content-Type", "")
+            try:
+                if ctype.startswith("multipart/"): req = _multipart(ctype, body)
+                else: req = json.loads(body or b"{}")
+                if self.path == "/score":
+                    out = result(_values(req))
+                    kind = "score"
+                else:
+                    if not isinstance(req, dict): raise TypeError(f"expected a JSON object, got {type(req).__name__}")
+                    imgs = [req[k] if isinstance(req[k], bytes) else base64.b64decode(req[k]) for k in ("thermo", "comp")]
+                    kind = "ocr"
+            except (ValueError, KeyError, TypeError) as e:
+                svc.count("bad_request")
+                self._send(400, {"error": f"{type(e).__name__}: {e}"})
+                return
+            if kind == "ocr":
+                try:
+                    out = svc.ocr(*imgs)
+                except Busy:
+                    svc.count("rejected")
+                    self._send(503, {"error": "queue full"}, [("Retry-After", "1")])
+                    return
+                except FutureTimeout:
+                    svc.count("timeout")
+                    self._send(504, {"error": f"timed out after {svc.timeout}s"})
+                    return
+                except ValueError as e:
+                    svc.count("bad_request")
+                    self._send(400, {"error": str(e)})
+                    return
+                except Exception as e:
+                    svc.count("error")
+                    self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                    return
+            ms = (time.perf_counter() - t0) * 1000
+            out["ms"] = round(ms, 1)
+            svc.count("ok", kind, ms)
+            self._send(200, out)
+        finally:
+            svc.clients.release()
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        conn, _ = super().get_request()
+        return conn, ("unix", 0)
+
+
+def make_server(service, host="127.0.0.1", port=8765, unix=None, verbose=False):
+    handler = type("BoundHandler", (Handler,), {"service": service})
+    if unix:
+        if os.path.exists(unix): os.remove(unix)
+        srv = UnixHTTPServer(unix, handler)
+    else:
+        srv = ThreadingHTTPServer((host, port), handler)
+        srv.daemon_threads = True
+    srv.verbose = verbose
+    return srv
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="serve", description="Headless Vortex scoring service.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="OCR worker processes (default: all cores)")
+    ap.add_argument("--queue", type=int, default=None, help="OCR jobs allowed to wait beyond the workers (default: 2x workers)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="per-request timeout, seconds")
+    ap.add_argument("--max-clients", type=int, default=64, help="concurrent connections")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    svc = Service(args.workers, args.queue, args.timeout, args.max_clients)
+    srv = make_server(svc, args.host, args.port, args.unix, args.verbose)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"serving on {where} ({svc.workers} workers, capacity {svc.capacity})", file=sys.stderr)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+        svc.close()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,162 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Synthetic thermodynamics/composite panels with known values.
+
+Panels use the labels parse_data() looks for (TEMPERATURE, DEW POINT, 3CAPE,
+0-3 KM LAPSE, PWAT, STP, VTP ...) in light text on the dark panel background,
+rendered with varying fonts, sizes, scales, blur, pixel noise and JPEG
+artifacts. Everything derives from the seed, so a dataset is reproducible.
+
+    python synth.py OUT_DIR -n 200     # <id>_thermo.png / <id>_comp.png + truth.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+from io import BytesIO
+
+
+# (field, label choices, unit choices); values are drawn by VALUES
+THERMO = [
+    ("temp", ["TEMPERATURE", "TEMP"], ["F", "°F"]),
+    ("dew", ["DEW POINT", "DEWPOINT"], ["F", "°F"]),
+    ("cape", ["CAPE", "SBCAPE"], [" J/kg"]),
+    ("3cape", ["3CAPE", "0-3 CAPE"], [" J/kg"]),
+    ("lapse", ["0-3 KM LAPSE", "0-3km LAPSE"], [" C/km", ""]),
+    ("rh", ["SURFACE RH", "SFC RH"], ["%"]),
+    ("mid_rh", ["500 MB RH", "MID RH"], ["%"]),
+    ("pwat", ["PWAT"], [" in", '"']),
+]
+COMP = [
+    ("srh", ["SRH", "0-1 SRH"], [" m2/s2", ""]),
+    ("stp", ["STP"], [""]),
+    ("vtp", ["VTP"], [""]),
+]
+VALUES = {
+    "temp": lambda r: str(r.randint(55, 105)),
+    "dew": lambda r: str(r.randint(40, 80)),
+    "cape": lambda r: str(r.randint(0, 70) * 100),
+    "3cape": lambda r: str(r.randint(0, 300)),
+    "lapse": lambda r: f"{r.uniform(5.0, 12.0):.1f}",
+    "rh": lambda r: str(r.randint(20, 100)),
+    "mid_rh": lambda r: str(r.randint(10, 100)),
+    "pwat": lambda r: f"{r.uniform(0.5, 2.6):.1f}",
+    "srh": lambda r: str(r.randint(20, 900)),
+    "stp": lambda r: f"{r.uniform(0, 25):.1f}",
+    "vtp": lambda r: f"{r.uniform(0, 6):.1f}",
+}
+FONTS = ("arial.ttf", "segoeui.ttf", "consola.ttf", "verdana.ttf", "DejaVuSans.ttf",
+         "DejaVuSansMono.ttf", "LiberationSans-Regular.ttf", "Roboto-Regular.ttf")
+BG = [(24, 24, 27), (17, 17, 17), (30, 32, 40), (12, 20, 34)]
+FG = [(244, 244, 245), (220, 220, 220), (255, 255, 255), (190, 230, 255)]
+
+_fonts = {}
+
+
+def font(name, size):
+    from PIL import ImageFont
+    key = (name, size)
+    if key not in _fonts:
+        try: _fonts[key] = ImageFont.truetype(name, size)
+        except OSError: _fonts[key] = ImageFont.load_default(size)
+    return _fonts[key]
+
+
+def available_fonts():
+    """FONTS entries this machine can load, or [None] for Pillow's built-in font."""
+    from PIL import ImageFont
+    out = []
+    for f in FONTS:
+        try: ImageFont.truetype(f, 12)
+        except OSError: continue
+        out.append(f)
+    return out or [None]
+
+
+def render(rows, rng, font_name=None, size=18, scale=1.0, noise=0.0, blur=0.0, jpeg=None):
+    """rows of (label, value text) -> RGB panel image."""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFilter
+    f = font(font_name or "", max(8, int(size * scale)))
+    line = int(size * scale * 1.9)
+    pad = int(16 * scale)
+    w = int(rng.randint(300, 420) * scale)
+    img = Image.new("RGB", (w, pad * 2 + line * (len(rows) + 1)), rng.choice(BG))
+    d = ImageDraw.Draw(img)
+    fg = rng.choice(FG)
+    d.text((pad, pad), rng.choice(["SOUNDING ANALYSIS", "THERMODYNAMICS", "COMPOSITES", "PARAMETERS"]),
+           font=f, fill=tuple(c // 2 for c in fg))
+    y = pad + line
+    two_col = rng.random() < 0.5  # value right-aligned vs right after the label
+    for label, text in rows:
+        d.text((pad, y), label, font=f, fill=fg)
+        if two_col: d.text((w - pad, y), text, font=f, fill=fg, anchor="ra")
+        else: d.text((pad + d.textlength(label + "  ", font=f), y), text, font=f, fill=fg)
+        y += line
+    if blur: img = img.filter(ImageFilter.GaussianBlur(blur * scale))
+    if noise:
+        a = np.asarray(img, dtype=np.int16) + np.random.default_rng(rng.randrange(1 << 30)).normal(0, noise, (img.height, img.width, 1)).astype(np.int16)
+        img = Image.fromarray(np.clip(a, 0, 255).astype(np.uint8))
+    if jpeg:
+        b = BytesIO()
+        img.save(b, "JPEG", quality=jpeg)
+        img = Image.open(BytesIO(b.getvalue())).convert("RGB")
+    return img
+
+
+def make_pair(seed, fonts=None, difficulty=None):
+    """-> (thermo image, comp image, truth {field: value string}, params used)."""
+    rng = random.Random(seed)
+    fonts = fonts or available_fonts()
+    lvl = rng.random() if difficulty is None else difficulty
+    opts = {
+        "font_name": rng.choice(fonts),
+        "size": rng.choice([14, 16, 18, 22]),
+        "scale": rng.choice([0.75, 1.0, 1.25, 1.5, 2.0]),
+        "noise": round(lvl * 12, 1),
+        "blur": round(lvl * 0.8, 2) if rng.random() < 0.5 else 0.0,
+        "jpeg": rng.choice([None, 90, 75]) if lvl > 0.3 else None,
+    }
+    truth, panels = {}, []
+    for spec in (THERMO, COMP):
+        rows = []
+        for field, labels, units in spec:
+            v = VALUES[field](rng)
+            truth[field] = v
+            rows.append((rng.choice(labels), v + rng.choice(units)))
+        panels.append(render(rows, rng, **opts))
+    return panels[0], panels[1], truth, opts
+
+
+def text_of(truth):
+    """The clean text a perfect OCR would return for a pair (for OCR-less parser runs)."""
+    rng = random.Random(json.dumps(truth, sort_keys=True))
+    lines = []
+    for spec in (THERMO, COMP):
+        for field, labels, units in spec:
+            lines.append(f"{rng.choice(labels)} {truth[field]}{rng.choice(units)}")
+    return "\n".join(lines)
+
+
+def write_dataset(out_dir, n, seed=0):
+    os.makedirs(out_dir, exist_ok=True)
+    fonts = available_fonts()
+    with open(os.path.join(out_dir, "truth.jsonl"), "w", encoding="utf-8") as f:
+        for i in range(n):
+            t, c, truth, opts = make_pair(seed * 1_000_003 + i, fonts)
+            pid = f"{i:05d}"
+            t.save(os.path.join(out_dir, f"{pid}_thermo.png"))
+            c.save(os.path.join(out_dir, f"{pid}_comp.png"))
+            f.write(json.dumps({"id": pid, "truth": truth, "render": opts}) + "\n")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Render synthetic panel pairs with ground truth.")
+    ap.add_argument("out")
+    ap.add_argument("-n", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    write_dataset(args.out, args.n, args.seed)
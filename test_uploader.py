@@ -0,0 +1,104 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Uploader spool/retry/drain against a local http.server.
+
+    python -m unittest test_uploader
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+import uploader
+
+
+class Hook(BaseHTTPRequestHandler):
+    fail = 0      # answer 500 to this many posts, then 204
+    posts = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        cls = type(self)
+        cls.posts += 1
+        code = 500 if cls.fail > 0 else 204
+        cls.fail -= 1
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *a):
+        pass
+
+
+class UploaderTest(unittest.TestCase):
+    def setUp(self):
+        Hook.fail, Hook.posts = 0, 0
+        self.srv = ThreadingHTTPServer(("127.0.0.1", 0), Hook)
+        threading.Thread(target=self.srv.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.srv.server_address[1]}/hook"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool = os.path.join(self.tmp.name, "spool")
+        self.results = []
+
+    def tearDown(self):
+        self.srv.shutdown()
+        self.srv.server_close()
+        self.tmp.cleanup()
+
+    def make(self, **kw):
+        kw.setdefault("backoff", 0.01)
+        u = uploader.Uploader(self.url, self.spool, on_result=lambda *r: self.results.append(r), **kw)
+        self.addCleanup(u.close)
+        return u
+
+    def submit(self, u):
+        return u.submit({"content": "test"}, [("t", Image.new("RGB", (40, 30), "red"))])
+
+    def test_retry_then_success_clears_spool(self):
+        Hook.fail = 1
+        u = self.make(retries=2)
+        rid = self.submit(u)
+        u.join()
+        self.assertEqual(Hook.posts, 2)
+        self.assertEqual(self.results, [(rid, True, None)])
+        self.assertFalse(os.path.exists(os.path.join(self.spool, rid)))
+        self.assertEqual(u.pending(), [])
+
+    def test_failed_report_is_drained_by_next_session(self):
+        Hook.fail = 1
+        u = self.make(retries=0)
+        rid = self.submit(u)
+        u.join()
+        self.assertFalse(self.results[0][1])
+        self.assertEqual(u.pending(), [rid])
+        u.close()
+
+        self.results.clear()
+        u2 = self.make()
+        u2.join()
+        self.assertEqual(self.results, [(rid, True, None)])
+        self.assertEqual(u2.pending(), [])
+        self.assertNotIn(rid, u2.submitted)
+
+    def test_bad_url_fails_at_once(self):
+        self.url = "x"  # the unconfigured webhook default
+        u = self.make(retries=4, backoff=5.0)
+        rid = self.submit(u)
+        u.join()
+        self.assertEqual(len(self.results), 1)
+        self.assertFalse(self.results[0][1])
+        self.assertIn("MissingSchema", self.results[0][2])
+        self.assertEqual(u.pending(), [])
+        self.assertFalse(u.spooled(rid))
+        self.assertTrue(os.path.isdir(os.path.join(self.spool, "failed", rid)))
+        self.assertEqual(Hook.posts, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
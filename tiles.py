@@ -0,0 +1,136 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Tile-parallel OCR for big panels: cut a thresholded image into horizontal
+bands of whole text lines and OCR the bands concurrently.
+
+Lines come from the horizontal projection profile (ink pixels per row).
+Bands are cut in the blank gaps between lines, so no text line is split,
+and each band keeps a few px of the neighbouring gap on either side, so
+neighbouring crops overlap in whitespace only. Bands with almost no ink are
+skipped. The bands of all images are dealt into up to os.cpu_count() batches
+of about equal area, and each batch is one backend.text_many() call, all
+running at once: with the list backend that is one tesseract process per
+core, each loading the model once; cli and tesserocr spread the batches
+over their own pools. Band texts are joined top to bottom, so parse_data() sees the same reading
+order as one whole-image pass.
+
+A panel is only tiled past MIN_PX pixels (after preprocessing); smaller
+ones go through tesseract whole, where splitting costs more than it saves.
+Set VORTEX_TILES=0 (or "tiles": false in config.json) to turn tiling off.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import config
+
+
+ENABLED = os.getenv("VORTEX_TILES", "1") != "0" and bool(config.get("tiles", True))
+MIN_PX = int(config.get("tile_min_px", 1_500_000))
+MIN_BAND = 64     # px; shorter bands aren't worth a tesseract start
+PAD = 6           # px of gap kept above and below each band
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="tile")
+        return _pool
+
+
+def ink_mask(thresh):
+    """Text pixels of a thresholded image: the minority class, whichever polarity it is."""
+    return thresh < 128 if thresh.mean() > 127 else thresh >= 128
+
+
+def text_lines(ink, min_ink=None, min_gap=None):
+    """Row spans [(y0, y1)] that carry ink, from the projection profile.
+
+    Rows with fewer than min_ink ink pixels count as blank; blank runs shorter
+    than min_gap (dots, underline gaps) don't split a line.
+    """
+    h, w = ink.shape
+    prof = np.count_nonzero(ink, axis=1)
+    rows = prof >= (min_ink or max(2, w // 500))
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.view(np.int8), [0]))))
+    spans = list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+    if not spans: return []
+    if min_gap is None:
+        min_gap = max(2, int(np.median([y1 - y0 for y0, y1 in spans]) * 0.25))
+    out = [list(spans[0])]
+    for y0, y1 in spans[1:]:
+        if y0 - out[-1][1] < min_gap: out[-1][1] = y1
+        else: out.append([y0, y1])
+    return [(y0, y1) for y0, y1 in out if y1 - y0 >= 2]
+
+
+def bands(thresh, n=None, min_band=MIN_BAND, pad=PAD):
+    """Split into about n bands of whole lines -> [(y0, y1)] top to bottom, blank stretches left out."""
+    ink = ink_mask(thresh)
+    lines = text_lines(ink)
+    if not lines: return []
+    n = n or os.cpu_count() or 2
+    h, w = ink.shape
+    target = max(min_band, (lines[-1][1] - lines[0][0]) / n)
+    groups, cur = [], [lines[0][0], lines[0][1]]
+    for y0, y1 in lines[1:]:
+        if cur[1] - cur[0] >= target:
+            groups.append(cur)
+            cur = [y0, y1]
+        else:
+            cur[1] = y1
+    groups.append(cur)
+
+    out = []
+    for i, (y0, y1) in enumerate(groups):
+        # grow into the gaps around the band, never past the middle of one
+        top = y0 - pad if i == 0 else max(y0 - pad, (groups[i - 1][1] + y0) // 2)
+        bot = y1 + pad if i == len(groups) - 1 else min(y1 + pad, (y1 + groups[i + 1][0] + 1) // 2)
+        top, bot = max(0, top), min(h, bot)
+        if np.count_nonzero(ink[top:bot]) < max(20, w // 50): continue  # specks only
+        out.append((top, bot))
+    return out
+
+
+def split(thresh, min_px=None):
+    """Band crops (views) of one image, or [thresh] itself when it's too small to be worth tiling."""
+    if not ENABLED or thresh.size < (MIN_PX if min_px is None else min_px): return [thresh]
+    b = bands(thresh)
+    if len(b) < 2: return [thresh]
+    return [thresh[y0:y1] for y0, y1 in b]
+
+
+def stitch(parts):
+    return "\n".join(p.strip("\n\f ") for p in parts if p and p.strip())
+
+
+def batches(crops, n):
+    """Consecutive runs of crops, about equal in pixels -> [(lo, hi)], at most n of them."""
+    sizes = np.cumsum([c.size for c in crops])
+    cuts = np.searchsorted(sizes, sizes[-1] * np.arange(1, n) / n, side="left") + 1
+    bounds = [0] + sorted(set(min(len(crops), int(c)) for c in cuts)) + [len(crops)]
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+
+def text_many(backend, imgs, psm=6):
+    """backend.text_many() over tiled images: bands split into per-core batches run side by side."""
+    crops = [split(im) for im in imgs]
+    if all(len(c) == 1 for c in crops): return backend.text_many(imgs, psm)
+    flat = [c for cs in crops for c in cs]
+    spans = batches(flat, min(len(flat), os.cpu_count() or 2))
+    futs = [pool().submit(backend.text_many, flat[lo:hi], psm) for lo, hi in spans]
+    found = [t for f in futs for t in f.result()]
+    out, i = [], 0
+    for cs in crops:
+        out.append(stitch(found[i:i + len(cs)]))
+        i += len(cs)
+    return out
@@ -0,0 +1,206 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Stage timing for the overlay.
+
+    with tracing.span("preprocess"): ...
+    t = tracing.begin("transition"); ...; t.end()    # spans that end in a Tk callback
+    tracing.end_run("ocr")                           # close the run the spans belong to
+    tracing.bind("watch")                            # this thread keeps a run of its own
+
+Spans add up into the run of the thread they end on. Threads share the
+overlay's run unless they bind() their own (watch mode does), and wrap()
+carries the caller's run into pool jobs.
+
+Off unless VORTEX_TRACE=1 (or "trace": true in config.json), read on the
+first span rather than at import; while off, span() is a flag check
+returning a shared no-op. When on, spans become Chrome
+trace events (chrome://tracing, Perfetto) written to trace.json at exit, and
+each run's per-stage totals plus process RSS are appended to a rolling
+trace.csv in the data directory. Hud draws the last run on a Tk canvas
+(VORTEX_TRACE_HUD=1).
+"""
+
+import atexit
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import config
+
+
+class _Noop:
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def end(self, **args): pass
+
+
+_NOOP = _Noop()
+
+
+def _rss_kb():
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except Exception:
+        return 0
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "t0")
+
+    def __init__(self, tracer, name, args):
+        self.tracer, self.name, self.args = tracer, name, args
+        self.t0 = time.perf_counter()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *a):
+        self.end()
+        return False
+
+    def end(self, **args):
+        if self.t0 is None: return
+        if args: self.args = dict(self.args, **args)
+        self.tracer._record(self.name, self.t0, time.perf_counter(), self.args)
+        self.t0 = None
+
+
+class Tracer:
+    def __init__(self, csv_path=None, json_path=None, max_events=20000, max_rows=20000):
+        self.csv_path = csv_path or config.data_dir("trace.csv")
+        self.json_path = json_path or config.data_dir("trace.json")
+        self.events = deque(maxlen=max_events)
+        self.max_rows = max_rows
+        self.run = {}  # run key -> {stage: ms}
+        self.runs = deque(maxlen=50)
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.epoch = time.perf_counter()
+
+    def _record(self, name, t0, t1, args):
+        ev = {"name": name, "ph": "X", "ts": round((t0 - self.epoch) * 1e6), "dur": round((t1 - t0) * 1e6),
+              "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+        with self.lock:
+            self.events.append(ev)
+            stages = self.run.setdefault(current(), {})
+            stages[name] = stages.get(name, 0.0) + (t1 - t0) * 1000
+
+    def end_run(self, label="run"):
+        with self.lock:
+            stages = self.run.pop(current(), {})
+        if not stages: return None
+        rec = {"ts": time.strftime("%Y-%m-%d %H:%M:%S"), "run": label, "stages": stages,
+               "total_ms": sum(stages.values()), "rss_kb": _rss_kb()}
+        self.runs.append(rec)
+        try: self._append_csv(rec)
+        except OSError: pass
+        for fn in list(self.listeners):
+            try: fn(rec)
+            except Exception: pass
+        return rec
+
+    def _append_csv(self, rec):
+        os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
+        new = not os.path.exists(self.csv_path)
+        with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if new: w.writerow(["ts", "run", "stage", "ms", "rss_kb"])
+            for stage, ms in rec["stages"].items(): w.writerow([rec["ts"], rec["run"], stage, f"{ms:.3f}", rec["rss_kb"]])
+        if os.path.getsize(self.csv_path) > self.max_rows * 48:  # roughly max_rows rows; keep the newest half
+            with open(self.csv_path, "r", encoding="utf-8") as f: lines = f.readlines()
+            keep = [lines[0]] + lines[1:][-(self.max_rows // 2):]
+            tmp = self.csv_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f: f.writelines(keep)
+            os.replace(tmp, self.csv_path)
+
+    def export(self, path=None):
+        """Write the buffered spans as Chrome trace JSON. Returns the path."""
+        path = path or self.json_path
+        with self.lock: events = list(self.events)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f: json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+_local = threading.local()
+_enabled = None
+_init_lock = threading.Lock()
+TRACER = None
+
+
+def enabled():
+    global _enabled, TRACER
+    if _enabled is None:
+        with _init_lock:
+            if _enabled is None:
+                on = os.getenv("VORTEX_TRACE", "") not in ("", "0") or bool(config.get("trace", False))
+                if on:
+                    TRACER = Tracer()
+                    atexit.register(TRACER.export)
+                _enabled = on
+    return _enabled
+
+
+def current():
+    return getattr(_local, "run", "overlay")
+
+
+def bind(run):
+    """Record this thread's spans into its own run (None: back to the shared one)."""
+    if run is None: _local.__dict__.pop("run", None)
+    else: _local.run = run
+
+
+def wrap(fn):
+    """fn, running in the caller's run whichever thread calls it."""
+    run = current()
+
+    def call(*a, **kw):
+        prev = getattr(_local, "run", None)
+        bind(run)
+        try: return fn(*a, **kw)
+        finally: bind(prev)
+    return call
+
+
+def span(name, **args):
+    return Span(TRACER, name, args) if (_enabled if _enabled is not None else enabled()) else _NOOP
+
+
+begin = span
+
+
+def end_run(label="run"):
+    return TRACER.end_run(label) if enabled() else None
+
+
+class Hud:
+    """Last run's stage times in a corner of the overlay canvas."""
+
+    def __init__(self, root, canvas):
+        self.root, self.canvas = root, canvas
+        self.item = canvas.create_text(8, 0, text="", anchor="sw", fill="#a1a1aa", font=("Consolas", 8), tags=("hud",))
+        if enabled(): TRACER.listeners.append(self._on_run)
+
+    def _on_run(self, rec):
+        lines = [f"{rec['run']}  {rec['total_ms']:.0f} ms  {rec['rss_kb'] // 1024} MB"]
+        lines += [f"{k:<18}{v:8.1f}" for k, v in sorted(rec["stages"].items(), key=lambda kv: -kv[1])]
+        text = "\n".join(lines)
+        self.root.after(0, lambda: self._show(text))
+
+    def _show(self, text):
+        try:
+            self.canvas.itemconfigure(self.item, text=text)
+            self.canvas.coords(self.item, 8, self.root.winfo_height() - 8)
+            self.canvas.tag_raise("hud")
+        except Exception:
+            pass  # canvas gone
@@ -0,0 +1,188 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Background uploader for error reports.
+
+submit() encodes the images (recompressing/downscaling them until the whole
+request fits max_bytes), writes the report to a spool directory and returns.
+A single worker thread posts spooled reports over one pooled requests.Session
+with a timeout and bounded exponential backoff. Reports that still fail stay
+in the spool and are retried every drain_every seconds and on the next start,
+so nothing is lost while offline. Permanent failures (4xx other than 429, or
+a malformed/unset URL) are moved to spool/failed instead of being retried
+forever.
+
+Pass any URL, e.g. a local http.server, to exercise it without Discord.
+"""
+
+import json
+import os
+import queue
+import random
+import shutil
+import threading
+import time
+import uuid
+from io import BytesIO
+
+import config
+
+
+MB = 1024 * 1024
+
+
+def _encode(img, fmt, scale=1.0, quality=85):
+    if scale < 1.0:
+        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))))
+    b = BytesIO()
+    if fmt == "PNG":
+        img.save(b, "PNG", optimize=False)
+    else:
+        img.convert("RGB").save(b, "JPEG", quality=quality, optimize=True)
+    return b.getvalue()
+
+
+def fit_images(images, budget):
+    """[(name, PIL image)] -> [(filename, bytes, mime)] totalling at most ~budget bytes.
+
+    Lossless PNG if it fits, else JPEG, then JPEG at shrinking sizes."""
+    files = [(f"{n}.png", _encode(img, "PNG"), "image/png") for n, img in images]
+    scale, quality = 1.0, 85
+    while sum(len(b) for _, b, _ in files) > budget and scale > 0.15:
+        files = [(f"{n}.jpg", _encode(img, "JPEG", scale, quality), "image/jpeg") for n, img in images]
+        if quality > 70: quality = 70
+        else: scale *= 0.75
+    return files
+
+
+class Uploader:
+    def __init__(self, url, spool_dir=None, max_bytes=8 * MB, retries=4, backoff=1.0,
+                 timeout=(5, 30), drain_every=60, on_result=None):
+        self.url = url  # str, or a callable so a changed webhook is picked up
+        self.spool = spool_dir or config.data_dir("spool")
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.drain_every = drain_every
+        self.on_result = on_result
+        self.q = queue.Queue()
+        self.queued = set()
+        self.submitted = set()  # ids submit() spooled in this session (not leftovers)
+        self.lock = threading.Lock()
+        self.session = None
+        self.sent = self.failed = 0
+        os.makedirs(self.spool, exist_ok=True)
+        for rid in self.pending(): self._enqueue(rid)  # left over from an earlier session
+        self.thread = threading.Thread(target=self._run, name="uploader", daemon=True)
+        self.thread.start()
+
+    def submit(self, payload, images):
+        """Spool a report (payload_json dict + [(name, PIL image)]) and queue it. Returns its id."""
+        rid = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        body = json.dumps(payload).encode()
+        files = fit_images(images, self.max_bytes - len(body) - 4096)
+        tmp = os.path.join(self.spool, rid + ".tmp")
+        os.makedirs(tmp)
+        for fname, data, _ in files:
+            with open(os.path.join(tmp, fname), "wb") as f: f.write(data)
+        with open(os.path.join(tmp, "report.json"), "w") as f:
+            json.dump({"payload": payload, "files": [[fn, mime] for fn, _, mime in files]}, f)
+        os.replace(tmp, os.path.join(self.spool, rid))  # only complete reports are ever picked up
+        with self.lock: self.submitted.add(rid)
+        self._enqueue(rid)
+        return rid
+
+    def pending(self):
+        return sorted(d for d in os.listdir(self.spool)
+                      if not d.endswith(".tmp") and d != "failed" and os.path.isdir(os.path.join(self.spool, d)))
+
+    def spooled(self, rid):
+        """True while a report is still waiting in the spool for another attempt."""
+        return os.path.isdir(os.path.join(self.spool, rid))
+
+    def join(self):
+        """Block until everything queued so far has been attempted."""
+        self.q.join()
+
+    def close(self):
+        self.q.put(None)
+        self.thread.join(timeout=5)
+        if self.session: self.session.close()
+
+    def _enqueue(self, rid):
+        with self.lock:
+            if rid in self.queued: return
+            self.queued.add(rid)
+        self.q.put(rid)
+
+    def _run(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        while True:
+            try:
+                rid = self.q.get(timeout=self.drain_every)
+            except queue.Empty:
+                for rid in self.pending(): self._enqueue(rid)
+                continue
+            if rid is None:
+                self.q.task_done()
+                return
+            try:
+                ok, err = self._deliver(rid)
+            except Exception as e:
+                ok, err = False, str(e)
+            with self.lock: self.queued.discard(rid)
+            if ok: self.sent += 1
+            else: self.failed += 1
+            if self.on_result:
+                try: self.on_result(rid, ok, err)
+                except Exception: pass
+            self.q.task_done()
+
+    def _deliver(self, rid):
+        import requests
+        d = os.path.join(self.spool, rid)
+        if not os.path.isdir(d): return True, None  # already sent by an earlier pass
+        with open(os.path.join(d, "report.json")) as f: rep = json.load(f)
+        url = self.url() if callable(self.url) else self.url
+        err = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            handles = []
+            try:
+                files = {}
+                for fname, mime in rep["files"]:
+                    fh = open(os.path.join(d, fname), "rb")
+                    handles.append(fh)
+                    files[fname] = (fname, fh, mime)
+                r = self.session.post(url, files=files, data={"payload_json": json.dumps(rep["payload"])},
+                                      timeout=self.timeout)
+            except (requests.exceptions.MissingSchema, requests.exceptions.InvalidSchema,
+                    requests.exceptions.InvalidURL) as e:
+                return False, self._give_up(d, rid, f"{type(e).__name__}: {e}")  # no retry will fix the URL
+            except requests.RequestException as e:
+                err = f"{type(e).__name__}: {e}"
+                continue
+            finally:
+                for fh in handles: fh.close()
+            if r.status_code < 300:
+                shutil.rmtree(d, ignore_errors=True)
+                return True, None
+            err = f"HTTP {r.status_code}"
+            if r.status_code == 429:
+                try: time.sleep(min(30.0, float(r.headers.get("Retry-After", 1))))
+                except ValueError: pass
+            elif 400 <= r.status_code < 500:
+                return False, self._give_up(d, rid, err)
+        return False, f"{err}; kept in spool for retry"
+
+    def _give_up(self, d, rid, err):
+        os.makedirs(os.path.join(self.spool, "failed"), exist_ok=True)
+        shutil.move(d, os.path.join(self.spool, "failed", rid))
+        return err
@@ -0,0 +1,124 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Multi-variant OCR: several preprocessing recipes per panel, best value per field wins.
+
+Every (variant, panel) job runs concurrently on a shared thread pool (the
+tesseract work happens in child processes or with the GIL released), at most
+INFLIGHT at a time, in variant order. Each
+job reads per-word confidences, and each field's confidence becomes the
+extractor's label/number confidence times the OCR confidence of those words.
+As results come in, every field keeps its most confident value. Once all
+fields clear `bar`, the remaining jobs are never submitted, and jobs already
+preprocessing skip their tesseract call, so an early exit really saves the
+work instead of leaving it running. A running tesseract is left to finish.
+
+Enable in the overlay with VORTEX_MULTI=1 or "multi_variant": true in config.json.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import backends
+import cache
+import extract
+import layout
+import pipeline
+import tracing
+
+
+GAS = (("gray", pipeline.to_gray), ("scale", pipeline.adaptive_scale))
+VARIANTS = {
+    "otsu": pipeline.Pipeline(),                                  # the default recipe
+    "adaptive": pipeline.Pipeline(GAS + (("threshold", pipeline.adaptive_inv),)),
+    "gray": pipeline.Pipeline(GAS + (("threshold", pipeline.invert),)),
+    "otsu_2x": pipeline.legacy(),
+    "noinv": pipeline.Pipeline(GAS + (("threshold", pipeline.otsu),)),
+    "otsu_3x": pipeline.Pipeline(min_scale=3.0, max_scale=3.0),
+}
+DEFAULT = ("otsu", "adaptive", "gray", "otsu_2x")
+BAR = 0.75  # an exact label and value read at ~90% OCR confidence scores ~0.8
+# two variants' worth of panels on 8 cores: the first recipes run together, the rest only if still needed
+INFLIGHT = max(2, (os.cpu_count() or 2) // 2)
+PSM = 6
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 2), thread_name_prefix="variant")
+        return _pool
+
+
+def read_panel(img, variant, stop=None):
+    """One recipe on one panel -> (values, confidences, text), or None if stop was set before OCR."""
+    with tracing.span("preprocess", variant=variant): th = VARIANTS[variant].run(img)
+    if stop is not None and stop.is_set(): return None
+    with tracing.span("tesseract", variant=variant): words = backends.get_backend().words(th, PSM)
+    lines = [[(w["text"], max(0.0, float(w["conf"])) / 100) for w in ws] for ws in layout.group_lines(words)]
+    vals, conf = extract.EXTRACTOR.extract_words(lines)
+    return vals, conf, "\n".join(" ".join(t for t, _ in ws) for ws in lines)
+
+
+def read_pair(thermo_img, comp_img, variants=DEFAULT, bar=BAR, timeout=30.0, stats=None, inflight=None):
+    """Like ocr.read_pair(), over several preprocessing variants. Adds "variant" (field -> recipe)."""
+    import numpy as np
+    import ocr
+    c = ocr.get_cache()
+    pk = None
+    if c:
+        pk = cache.combine_keys(cache.image_key(np.asarray(thermo_img)), cache.image_key(np.asarray(comp_img)),
+                                "multi", *variants, str(bar))
+        hit = c.get(pk)
+        if hit is not None: return dict(hit)
+
+    t0 = time.perf_counter()
+    fields = extract.EXTRACTOR.fields
+    best = {f: ("", 0.0, None) for f in fields}
+    raw = {}
+    job = tracing.wrap(read_panel)
+    todo = [(v, i, img) for v in variants for i, img in enumerate((thermo_img, comp_img))]
+    stop = threading.Event()
+    jobs, pending, done_n, err = {}, set(), 0, None
+    nxt = 0
+    while True:
+        while nxt < len(todo) and len(pending) < (inflight or INFLIGHT):
+            v, i, img = todo[nxt]
+            fut = pool().submit(job, img, v, stop)
+            jobs[fut] = (v, i)
+            pending.add(fut)
+            nxt += 1
+        if not pending: break
+        done, pending = wait(pending, timeout=max(0.0, timeout - (time.perf_counter() - t0)), return_when=FIRST_COMPLETED)
+        if not done: break
+        for fut in done:
+            v, i = jobs[fut]
+            try: vals, conf, text = fut.result()
+            except Exception as e:
+                err = e
+                continue
+            done_n += 1
+            if v == variants[0] or i not in raw: raw[i] = text
+            for f in fields:
+                if vals[f] and conf[f] > best[f][1]: best[f] = (vals[f], conf[f], v)
+        if all(best[f][1] >= bar for f in fields): break
+    stop.set()  # jobs still preprocessing skip tesseract
+    cancelled = (len(todo) - nxt) + sum(fut.cancel() for fut in pending)
+    if done_n == 0 and err is not None: raise err
+
+    data = {f: best[f][0] for f in fields}
+    data["pwat"] = ocr.fix_pwat(data["pwat"])
+    data["conf"] = {f: round(best[f][1], 3) for f in fields}
+    data["variant"] = {f: best[f][2] for f in fields if best[f][2]}
+    data["raw"] = raw.get(0, "") + "\n" + raw.get(1, "")
+    if stats is not None:
+        stats.update(jobs=len(todo), finished=done_n, cancelled=cancelled, ms=(time.perf_counter() - t0) * 1000)
+    if c and ((not pending and nxt == len(todo)) or all(best[f][1] >= bar for f in fields)): c.put(pk, data)  # not timed-out partials
+    return data
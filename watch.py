@@ -0,0 +1,120 @@
+# Copyright (c) 2025 contralious
+# Licensed under the GNU General Public License v3.0
+# See the LICENSE file for details.
+
+"""Watch mode: re-grab the saved panel rectangles on an interval and re-score on change.
+
+Each tick grabs both panels and compares a box-downsampled grayscale copy
+against the previous one. OCR and scoring only run when some cell moved by
+more than `tol` grey levels, so hours of watching an unchanged panel cost a
+couple of small grabs per interval. Values that come back identical to the
+last update (a cursor passing over, a redrawn border) are not pushed again.
+
+    python watch.py <dir-or-manifest> [interval]   # replay recorded pairs, print updates
+"""
+
+import sys
+import threading
+import time
+
+import numpy as np
+
+import tracing
+
+
+def signature(img, factor=4):
+    """Small grayscale thumbnail: one cell per factor x factor block."""
+    import cv2
+    import pipeline
+    g = pipeline.to_gray(img, {})
+    h, w = g.shape
+    return cv2.resize(g, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def changed(a, b, tol):
+    return a is None or a.shape != b.shape or int(np.abs(a - b).max()) > tol
+
+
+class Watcher:
+    def __init__(self, rects, source=None, interval=2.0, on_update=None, on_error=None,
+                 speed=60.0, tol=10, factor=4):
+        import capture
+        self.rects = dict(rects)
+        self.source = source or capture.ScreenSource()
+        self.interval = interval
+        self.on_update = on_update
+        self.on_error = on_error
+        self.speed = speed
+        self.tol = tol
+        self.factor = factor
+        self.sigs = {}
+        self.last = None
+        self.ticks = self.changes = self.updates = 0
+        self.grab_ms = self.ocr_ms = 0.0
+        self._stop = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.running: return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="watch", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        tracing.bind("watch")  # keep watch spans out of the overlay's own runs
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                if self.tick() is None: break
+            except Exception as e:
+                if self.on_error: self.on_error(e)
+            self._stop.wait(max(0.0, self.interval - (time.perf_counter() - t0)))
+
+    def tick(self):
+        """One grab/compare/maybe-OCR step. True if results were pushed, None when the source ran dry."""
+        t0 = time.perf_counter()
+        frames = self.source.grab(self.rects)
+        if frames is None: return None
+        sigs = {k: signature(img, self.factor) for k, img in frames.items()}
+        self.grab_ms = (time.perf_counter() - t0) * 1000
+        self.ticks += 1
+        if not any(changed(self.sigs.get(k), s, self.tol) for k, s in sigs.items()): return False
+        self.changes += 1
+
+        import engine, ocr
+        t0 = time.perf_counter()
+        data = ocr.read_pair(frames["thermo"], frames["comp"])
+        v = engine.to_values({k: data.get(k, "") for k in engine.FIELDS})
+        v["speed"] = self.speed
+        result = engine.score_one(v)
+        self.ocr_ms = (time.perf_counter() - t0) * 1000
+        tracing.end_run("watch")
+        self.sigs = sigs  # only after a successful read, so a failed tick is retried
+        key = tuple(data.get(k, "") for k in engine.FIELDS)
+        if key == self.last: return False
+        self.last = key
+        self.updates += 1
+        if self.on_update: self.on_update(data, result, frames)
+        return True
+
+    def stats(self):
+        return {"ticks": self.ticks, "changes": self.changes, "updates": self.updates,
+                "grab_ms": round(self.grab_ms, 2), "ocr_ms": round(self.ocr_ms, 1)}
+
+
+if __name__ == "__main__":
+    import capture
+    src = capture.ReplaySource(sys.argv[1])
+    w = Watcher({"thermo": None, "comp": None}, src, interval=float(sys.argv[2]) if len(sys.argv) > 2 else 0.0,
+                on_update=lambda d, r, f: print(r[3], {k: round(p, 1) for k, p in r[0].items()}),
+                on_error=lambda e: print(f"error: {e}"))
+    w.start()
+    w.thread.join()
+    print(w.stats())